@@ -0,0 +1,93 @@
+import re
+from dataclasses import dataclass
+
+from MatchResult import MatchResult
+
+PLACEHOLDER_RE = re.compile(r"<([A-Z_]+)>")
+
+
+def split_path_template(template: str) -> tuple[str, ...]:
+    """
+    Splits a resolved path template into literal text and capture slots:
+    './Lab/Lab <N>' → ('./Lab/Lab ', 'N', '')
+    Even indices are literal text, odd indices are capture names.
+    """
+    return tuple(PLACEHOLDER_RE.split(template))
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRule:
+    """
+    Immutable, ready-to-match form of a Rule.
+    Structural placeholders ($TAG, $PARENT_TAG, $PARENT_PATH) are resolved and
+    regexes are compiled once, so matching only searches and fills capture slots.
+    literals holds, per pattern, the longest normalized text a match must contain
+    ('' when a pattern has no literal text).
+    anchored marks the patterns whose template starts with the parent's tag (e.g. '$PARENT_TAG <N>'):
+    any match of them begins with a match of the parent's tag pattern, so they are searched
+    from where the parent's tag matched instead of from the start of the filename.
+    """
+
+    name: str
+    patterns: tuple[tuple[re.Pattern, tuple[str, ...]], ...]
+    literals: tuple[str, ...]
+    path_parts: tuple[str, ...]
+    children: tuple["CompiledRule", ...]
+    anchored: tuple[bool, ...] = ()
+
+    def search(self, file: str, anchor: int | None = None) -> tuple[dict[str, str], int | None] | None:
+        """
+        Returns the captures of the first pattern that matches, and where the match starts if it was
+        the tag pattern (the position children anchor to), or None if no pattern matches.
+        anchor is where the parent's tag pattern matched; None means it didn't, so anchored
+        patterns can't match anywhere and are skipped.
+        """
+        anchored = self.anchored or (False,) * len(self.patterns)
+        for index, ((pattern, keys), is_anchored) in enumerate(zip(self.patterns, anchored)):
+            if is_anchored:
+                if anchor is None:
+                    continue
+                match = pattern.search(file, anchor)
+            else:
+                match = pattern.search(file)
+            if match:
+                return dict(zip(keys, match.groups())), match.start() if index == 0 else None
+        return None
+
+    def fill_path(self, captures: dict[str, str]) -> str:
+        parts = self.path_parts
+        if len(parts) == 1:
+            return parts[0]
+
+        out = []
+        for i, part in enumerate(parts):
+            if i % 2 == 0:
+                out.append(part)
+            else:
+                out.append(captures.get(part, f"<{part}>"))
+        return "".join(out)
+
+    def match(self, file: str, captures: dict[str, str] | None = None,
+              chain: tuple[str, ...] = (), anchor: int | None = None) -> MatchResult | None:
+        """
+        Matches the file against this rule and its children without touching any shared state.
+        Returns the deepest match, or None if this rule doesn't match.
+        """
+        found = self.search(file, anchor)
+        if found is None:
+            return None
+
+        own, start = found
+        captures = {**captures, **own} if captures else own
+        chain = chain + (self.name,)
+
+        for child in self.children:
+            result = child.match(file, captures, chain, start)
+            if result is not None:
+                return result   # deeper match found
+
+        return MatchResult(chain, tuple(captures.items()), self.fill_path(captures))
+
+    def get_path(self, file: str) -> str | None:
+        result = self.match(file)
+        return result.path if result is not None else None
@@ -0,0 +1,41 @@
+import re
+from typing import Iterator
+
+from Course import Course
+
+SEPARATORS_RE = re.compile(r"[\s_-]+")
+
+
+def normalize_course_code(course_code: str) -> str:
+    """
+    Folds case, spaces, underscores and dashes into one canonical key:
+    'SYSC 2004', 'sysc_2004', 'SYSC-2004' → 'SYSC2004'
+    """
+    return SEPARATORS_RE.sub("", course_code).upper()
+
+
+class CourseIndex:
+    """
+    Hash index of courses keyed on their normalized course code, used to look up the
+    Course behind a matched course rule. Filenames are classified by the course rules.
+    """
+
+    courses: dict[str, Course]
+
+    def __init__(self) -> None:
+        self.courses = {}
+
+    def add(self, course: Course):
+        self.courses[normalize_course_code(course.course_code)] = course
+
+    def get(self, course_code: str) -> Course | None:
+        return self.courses.get(normalize_course_code(course_code))
+
+    def __contains__(self, course_code: str) -> bool:
+        return normalize_course_code(course_code) in self.courses
+
+    def __iter__(self) -> Iterator[Course]:
+        return iter(self.courses.values())
+
+    def __len__(self) -> int:
+        return len(self.courses)
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class MatchResult:
+    """
+    Outcome of matching one file against a rule tree.
+    rules is the chain of matched rule names from the top-level rule down to the deepest match.
+    """
+
+    rules: tuple[str, ...]
+    captures: tuple[tuple[str, str], ...]
+    path: str
+
+    def capture(self, key: str) -> str | None:
+        for name, value in self.captures:
+            if name == key:
+                return value
+        return None
@@ -0,0 +1,121 @@
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from mover import MoveStatus, move_file
+
+DEFAULT_WORKERS = 8
+DEFAULT_PER_FOLDER = 4
+
+
+@dataclass(frozen=True, slots=True)
+class MoveResult:
+    src: Path
+    dst: Path
+    status: MoveStatus
+    error: str | None = None
+
+
+# The caller's handle on a move's result, with the move itself
+Move = tuple[Future[MoveResult], Path, Path]
+
+
+class MoveExecutor:
+    """
+    Moves files on a thread pool and reports one MoveResult per move, in input order.
+    At most per_folder moves run at once into the same destination folder; the rest wait in
+    a queue for that folder without holding a worker, so a slow synced folder can't take
+    every worker.
+    confirm_create is asked at most once per missing folder, one question at a time.
+    Once cancel is set, moves that haven't started are reported as CANCELLED and run() stops
+    taking new moves, so every move that happened still gets its own result.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, per_folder: int = DEFAULT_PER_FOLDER,
+                 confirm_create: Callable[[Path], bool] | None = None,
+                 cancel: threading.Event | None = None) -> None:
+        self.workers = workers
+        self.per_folder = per_folder
+        self.confirm_create = confirm_create
+        self.cancel = cancel or threading.Event()
+        self.confirm_lock = threading.Lock()
+        self.confirmed: dict[Path, bool] = {}
+
+    def confirm(self, folder: Path) -> bool:
+        if self.confirm_create is None:
+            return False
+        with self.confirm_lock:
+            if folder not in self.confirmed:
+                self.confirmed[folder] = self.confirm_create(folder)
+            return self.confirmed[folder]
+
+    def move(self, src: Path, dst: Path) -> MoveResult:
+        try:
+            return MoveResult(src, dst, move_file(src, dst, self.confirm))
+        except Exception as error:
+            return MoveResult(src, dst, MoveStatus.ERROR, str(error))
+
+    def run(self, moves: Iterable[tuple[Path, Path]]) -> Iterator[MoveResult]:
+        lock = threading.Lock()
+        running: Counter[Path] = Counter()
+        waiting: dict[Path, deque[Move]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def schedule(move: Move):
+                folder = move[2].parent
+                with lock:
+                    if running[folder] >= self.per_folder:
+                        waiting.setdefault(folder, deque()).append(move)
+                        return
+                    running[folder] += 1
+                pool.submit(work, move)
+
+            def work(move: Move):
+                result, src, dst = move
+                if result.set_running_or_notify_cancel():
+                    result.set_result(self.move(src, dst))
+                # Hand this folder's slot straight to the next move waiting for it
+                with lock:
+                    queued = waiting.get(dst.parent)
+                    if not queued:
+                        running[dst.parent] -= 1
+                        waiting.pop(dst.parent, None)
+                        return
+                    move = queued.popleft()
+                pool.submit(work, move)
+
+            pending: deque[Move] = deque()
+            cancelled = False
+
+            def collect() -> MoveResult:
+                nonlocal cancelled
+                if self.cancel.is_set() and not cancelled:
+                    cancelled = True
+                    for result, _, _ in pending:
+                        result.cancel()
+                result, src, dst = pending.popleft()
+                if result.cancelled():
+                    return MoveResult(src, dst, MoveStatus.CANCELLED)
+                return result.result()
+
+            try:
+                for src, dst in moves:
+                    if self.cancel.is_set():
+                        break
+                    move: Move = (Future(), src, dst)
+                    pending.append(move)
+                    schedule(move)
+                    # Keep a bounded window of queued moves so results stream out as they finish
+                    if len(pending) >= self.workers * 4:
+                        yield collect()
+
+                while pending:
+                    yield collect()
+            finally:
+                with lock:
+                    waiting.clear()
+                for result, _, _ in pending:
+                    result.cancel()
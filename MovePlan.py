@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from mover import MoveStatus
+from MovePlanner import Collision, MovePlanner, PlannedMove
+from sorter import (BASE_DST_PATH, BASE_SRC_PATH, JOURNAL_PATH, RULES_HELP, apply_plan, classify_folder, load_rules,
+                    print_summary)
+
+PLAN_PATH = "./move_plan.ndjson"
+PLAN_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class PlanEntry:
+    src: Path
+    dst: Path
+    rules: tuple[str, ...]
+    size: int
+    mtime_ns: int
+
+    def to_json(self) -> str:
+        return json.dumps({"src": str(self.src), "dst": str(self.dst), "rules": list(self.rules),
+                           "size": self.size, "mtime_ns": self.mtime_ns})
+
+    @classmethod
+    def from_json(cls, record: dict) -> "PlanEntry":
+        return cls(Path(record["src"]), Path(record["dst"]), tuple(record["rules"]), record["size"], record["mtime_ns"])
+
+    def revalidate(self) -> MoveStatus | None:
+        """
+        Returns None if src still has the size and mtime it had when planned, otherwise why not.
+        """
+        try:
+            stat = os.stat(self.src)
+        except FileNotFoundError:
+            return MoveStatus.MISSING_SRC
+        if stat.st_size != self.size or stat.st_mtime_ns != self.mtime_ns:
+            return MoveStatus.CHANGED
+        return None
+
+
+def write_plan(f: IO[str], entries: Iterable[PlanEntry]) -> int:
+    """
+    Streams a plan as NDJSON: one header line, then one line per move. Returns the number of moves.
+    """
+    f.write(json.dumps({"plan": PLAN_VERSION, "time": time.time()}) + "\n")
+    count = 0
+    for entry in entries:
+        f.write(entry.to_json() + "\n")
+        count += 1
+    return count
+
+
+def read_plan(f: IO[str]) -> Iterator[PlanEntry]:
+    """
+    Streams the entries of a plan. The header is optional, so a plan split into chunks by
+    line (e.g. with `split -l`) can be applied chunk by chunk.
+    """
+    for line in f:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "plan" in record:
+            if record["plan"] != PLAN_VERSION:
+                raise ValueError(f"Unsupported plan version {record['plan']}")
+            continue
+        yield PlanEntry.from_json(record)
+
+
+def plan_folder(src_root: Path, dst_root: Path, rules: str | None, exclude: Iterable[str] = (),
+                max_depth: int | None = None) -> Iterator[PlanEntry]:
+    rule_manager = load_rules(rules)
+    for entry, dst, result in classify_folder(src_root, dst_root, rule_manager, exclude, max_depth):
+        stat = entry.stat()
+        yield PlanEntry(Path(entry.path), dst, result.rules, stat.st_size, stat.st_mtime_ns)
+
+
+def revalidate_plan(entries: Iterable[PlanEntry], collision: Collision,
+                    create_folders: bool = False) -> list[PlannedMove]:
+    """
+    Drops entries whose source changed since planning, then resolves folders and collisions
+    for the rest against the destination as it is now.
+    """
+    stale: list[PlannedMove] = []
+    moves: list[tuple[Path, Path]] = []
+    for entry in entries:
+        status = entry.revalidate()
+        if status is None:
+            moves.append((entry.src, entry.dst))
+        else:
+            stale.append(PlannedMove(entry.src, entry.dst, status))
+
+    confirm_create = (lambda folders: True) if create_folders else None
+    return stale + MovePlanner(collision).plan(moves, confirm_create)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Write a move plan, or apply one without rescanning")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan = commands.add_parser("plan", help="scan and classify, then write the moves to a plan file")
+    plan.add_argument("--src", type=Path, default=BASE_SRC_PATH, help="folder to sort")
+    plan.add_argument("--dst", type=Path, default=BASE_DST_PATH, help="root that rule paths are relative to")
+    plan.add_argument("--rules", default=None, help=RULES_HELP)
+    plan.add_argument("--exclude", action="append", default=[], help="glob of names to skip (repeatable)")
+    plan.add_argument("--max-depth", type=int, default=None, help="how deep to walk below --src")
+    plan.add_argument("--output", default=PLAN_PATH, help="plan file to write ('-' for stdout)")
+
+    apply = commands.add_parser("apply", help="run the moves of one or more plan files")
+    apply.add_argument("plans", nargs="*", default=[PLAN_PATH], help="plan files ('-' for stdin)")
+    apply.add_argument("--create-folders", action="store_true", help="create missing destination folders")
+    apply.add_argument("--collision", choices=[c.value for c in Collision], default=Collision.SKIP.value,
+                       help="what to do when the destination name is taken")
+    apply.add_argument("--journal", default=JOURNAL_PATH, help="journal file")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "plan":
+        entries = plan_folder(args.src, args.dst, args.rules, args.exclude, args.max_depth)
+        if args.output == "-":
+            write_plan(sys.stdout, entries)
+            return
+        with open(args.output, "w", encoding="utf-8") as f:
+            count = write_plan(f, entries)
+        print(f"{count} moves written to {args.output}")
+        return
+
+    summary: Counter[str] = Counter()
+    for path in args.plans:
+        if path == "-":
+            planned = revalidate_plan(read_plan(sys.stdin), Collision(args.collision), args.create_folders)
+        else:
+            with open(path, encoding="utf-8") as f:
+                planned = revalidate_plan(read_plan(f), Collision(args.collision), args.create_folders)
+        apply_plan(planned, args.journal, summary)
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,118 @@
+import os
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from mover import MoveStatus
+
+if TYPE_CHECKING:
+    from duplicates import DuplicateFinder
+
+
+class Collision(StrEnum):
+    SKIP = "skip"
+    SUFFIX = "suffix"
+
+
+@dataclass(frozen=True, slots=True)
+class PlannedMove:
+    src: Path
+    dst: Path
+    status: MoveStatus | None = None  # None when the move is ready to run
+
+    @property
+    def ready(self) -> bool:
+        return self.status is None
+
+
+def suffixed_name(name: str, n: int) -> str:
+    """
+    'Lab 1.pdf', 2 → 'Lab 1 (2).pdf'
+    """
+    stem, ext = os.path.splitext(name)
+    return f"{stem} ({n}){ext}"
+
+
+class MovePlanner:
+    """
+    Prepares a batch of moves before any of them run.
+    Each destination folder is listed once; every missing folder is confirmed with a single
+    question and created in one sorted pass; name collisions are resolved against the
+    listings (and against earlier moves in the batch) without probing the filesystem again.
+    With a DuplicateFinder, a move whose destination already exists with identical content
+    is marked as a duplicate instead of going through the collision policy.
+    """
+
+    def __init__(self, collision: Collision = Collision.SKIP, duplicates: "DuplicateFinder | None" = None) -> None:
+        self.collision = collision
+        self.duplicates = duplicates
+        self.snapshot: dict[Path, set[str] | None] = {}
+
+    def take_snapshot(self, folders: Iterable[Path]):
+        for folder in folders:
+            if folder in self.snapshot:
+                continue
+            try:
+                with os.scandir(folder) as entries:
+                    self.snapshot[folder] = {os.path.normcase(entry.name) for entry in entries}
+            except (FileNotFoundError, NotADirectoryError):
+                self.snapshot[folder] = None
+
+    def missing_folders(self) -> list[Path]:
+        return sorted(folder for folder, names in self.snapshot.items() if names is None)
+
+    def create_folders(self, folders: list[Path]):
+        for folder in sorted(folders):
+            folder.mkdir(parents=True, exist_ok=True)
+            self.snapshot[folder] = set()
+
+    def collides(self, dst: Path) -> bool:
+        names = self.snapshot[dst.parent]
+        return names is not None and os.path.normcase(dst.name) in names
+
+    def find_duplicates(self, moves: list[tuple[Path, Path]]) -> set[int]:
+        """
+        Returns the indices of moves whose existing destination has the same content as the source.
+        """
+        if self.duplicates is None:
+            return set()
+
+        collisions = [i for i, (_, dst) in enumerate(moves) if self.collides(dst)]
+        found = self.duplicates.find(moves[i] for i in collisions)
+        return {i for i, duplicate in zip(collisions, found) if duplicate}
+
+    def resolve(self, src: Path, dst: Path, duplicate: bool = False) -> PlannedMove:
+        names = self.snapshot[dst.parent]
+        if names is None:
+            return PlannedMove(src, dst, MoveStatus.MISSING_FOLDER)
+
+        if os.path.normcase(dst.name) in names:
+            if duplicate:
+                return PlannedMove(src, dst, MoveStatus.DUPLICATE)
+            if self.collision == Collision.SKIP:
+                return PlannedMove(src, dst, MoveStatus.SKIPPED_EXISTS)
+            n = 1
+            while os.path.normcase(suffixed_name(dst.name, n)) in names:
+                n += 1
+            dst = dst.with_name(suffixed_name(dst.name, n))
+
+        names.add(os.path.normcase(dst.name))
+        return PlannedMove(src, dst)
+
+    def plan(self, moves: Iterable[tuple[Path, Path]],
+             confirm_create: Callable[[list[Path]], bool] | None = None) -> list[PlannedMove]:
+        """
+        Returns one PlannedMove per move, in input order.
+        confirm_create is called once with every folder that needs creating; if it
+        returns True they are all created, otherwise moves into them are not ready.
+        """
+        moves = list(moves)
+        self.take_snapshot({dst.parent for _, dst in moves})
+
+        missing = self.missing_folders()
+        if missing and confirm_create is not None and confirm_create(missing):
+            self.create_folders(missing)
+
+        duplicates = self.find_duplicates(moves)
+        return [self.resolve(src, dst, i in duplicates) for i, (src, dst) in enumerate(moves)]
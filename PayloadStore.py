@@ -0,0 +1,107 @@
+import itertools
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# Shared by every store, so ids stay unique when a store is replaced (e.g. by a rescan)
+PAYLOAD_IDS = itertools.count()
+
+
+class Payload:
+    """
+    One file waiting to be sent. Paths are kept as an interned folder string plus a name,
+    since thousands of files share a handful of folders; src and dst build Path objects on access.
+    """
+
+    __slots__ = ("id", "src_dir", "name", "dst_dir", "dst_name", "course_code", "year", "folder", "staged", "sent")
+
+    def __init__(self, payload_id: int, src: str | os.PathLike, dst: str | os.PathLike, course_code: str,
+                 year: str | None = None, folder: str | None = None) -> None:
+        self.id = payload_id
+        src_dir, self.name = os.path.split(src)
+        self.src_dir = sys.intern(src_dir)
+        self.dst = dst
+        self.course_code = sys.intern(course_code)
+        self.year = sys.intern(year) if year is not None else None
+        self.folder = sys.intern(folder) if folder is not None else None
+        self.staged = False
+        self.sent = False
+
+    @property
+    def src(self) -> Path:
+        return Path(self.src_dir, self.name)
+
+    @property
+    def dst(self) -> Path:
+        return Path(self.dst_dir, self.dst_name)
+
+    @dst.setter
+    def dst(self, dst: str | os.PathLike):
+        dst_dir, dst_name = os.path.split(dst)
+        self.dst_dir = sys.intern(dst_dir)
+        # Reuse the source name's string when the file keeps its name
+        self.dst_name = self.name if dst_name == self.name else dst_name
+
+    def __repr__(self) -> str:
+        return f"Payload({self.id}, {self.name!r} → {self.dst_dir!r}, staged={self.staged}, sent={self.sent})"
+
+
+class PayloadStore:
+    """
+    Payloads in scan order, with O(1) lookup by id and groupings by course, year and folder
+    kept up to date as payloads are added, so filters read a group instead of scanning every payload.
+    Removal is batched: remove() rebuilds the order and groupings in a single pass.
+    Supports len() and indexing, so it can back a VirtualTable directly.
+    """
+
+    payloads: dict[int, Payload]
+    order: list[Payload]
+
+    def __init__(self) -> None:
+        self.payloads = {}
+        self.order = []
+        self.by_course: dict[str, list[Payload]] = {}
+        self.by_year: dict[str | None, list[Payload]] = {}
+        self.by_folder: dict[str | None, list[Payload]] = {}
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, index: int) -> Payload:
+        return self.order[index]
+
+    def __iter__(self) -> Iterator[Payload]:
+        return iter(self.order)
+
+    def index(self, payload: Payload):
+        self.by_course.setdefault(payload.course_code, []).append(payload)
+        self.by_year.setdefault(payload.year, []).append(payload)
+        self.by_folder.setdefault(payload.folder, []).append(payload)
+
+    def add(self, src: str | os.PathLike, dst: str | os.PathLike, course_code: str,
+            year: str | None = None, folder: str | None = None) -> Payload:
+        payload = Payload(next(PAYLOAD_IDS), src, dst, course_code, year, folder)
+        self.payloads[payload.id] = payload
+        self.order.append(payload)
+        self.index(payload)
+        return payload
+
+    def get(self, payload_id: int) -> Payload | None:
+        return self.payloads.get(payload_id)
+
+    def in_courses(self, course_codes: Iterable[str]) -> list[Payload]:
+        return [payload for course_code in course_codes for payload in self.by_course.get(course_code, [])]
+
+    def staged(self) -> list[Payload]:
+        return [payload for payload in self.order if payload.staged]
+
+    def remove(self, payload_ids: Iterable[int]):
+        removed = {payload_id for payload_id in payload_ids if self.payloads.pop(payload_id, None) is not None}
+        if not removed:
+            return
+
+        self.order = [payload for payload in self.order if payload.id not in removed]
+        self.by_course, self.by_year, self.by_folder = {}, {}, {}
+        for payload in self.order:
+            self.index(payload)
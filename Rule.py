@@ -1,8 +1,8 @@
 from Keywords import *
+from CompiledRule import CompiledRule, PLACEHOLDER_RE, split_path_template
+from TagAutomaton import normalize_literal
 import re
 
-PLACEHOLDER_RE = re.compile(r"<([A-Z_]+)>")
-
 
 class Rule:
 
@@ -20,9 +20,10 @@ class Rule:
         self.children: list[Rule] = []
         self.parent: Rule | None = parent
         self.case_sensitive = False
+        # Only match the tag at the start of a word: 'Lab' matches 'Labs', 'Lab3' and 'SYSC_Lab' but not 'Syllabus'
+        self.word_start = False
         self.tag_templates = [self.tag_template] + (self.aliases or [])
         self.patterns: list[re.Pattern] = []
-        self.captures: dict[str, str] = {}
 
     def tag_templates_to_regex(self, templates: list[str]):
         """
@@ -40,6 +41,10 @@ class Rule:
 
             # Allow flexible whitespace
             escaped = escaped.replace(r'\ ', r'\s+')
+
+            # Digits and '_' count as separators, so only a letter before the tag rejects it
+            if self.word_start:
+                escaped = rf"(?<![^\W\d_]){escaped}"
             patterns.append(re.compile(escaped, flags))
 
         return patterns
@@ -53,14 +58,6 @@ class Rule:
 
     __repr__ = __str__
 
-    def resolve_template(self, template: str) -> str:
-
-        def repl(match: re.Match[str]) -> str:
-            key = match.group(1)
-            return self.captures.get(key, match.group(0))
-
-        return PLACEHOLDER_RE.sub(repl, template)
-
     def resolve_structural_placeholders(self) -> str:
         # Start with own path
         path = self.path
@@ -76,8 +73,7 @@ class Rule:
 
         return path
 
-    def matches(self, file: str) -> bool:
-        # Resolve structural placeholders just-in-time
+    def resolve_tag_templates(self) -> list[str]:
         resolved_templates = []
         for template in self.tag_templates:
             t = template
@@ -85,36 +81,30 @@ class Rule:
                 t = t.replace(PARENT_TAG, self.parent.tag_template)
             t = t.replace(SELF_TAG, self.tag_template)
             resolved_templates.append(t)
+        return resolved_templates
 
-        # Compile regexes from resolved templates
+    def compile(self) -> CompiledRule:
+        """
+        Builds the immutable matching tree for this rule and its children.
+        Must be called after all children have been added.
+        """
+        resolved_templates = self.resolve_tag_templates()
         patterns = self.tag_templates_to_regex(resolved_templates)
-
-        for pattern, template in zip(patterns, resolved_templates):
-            match = pattern.search(file)
-            if match:
-                placeholders = PLACEHOLDER_RE.findall(template)
-                for key, value in zip(placeholders, match.groups()):
-                    self.captures[key] = value
-                return True
-
-        return False
-
-    def get_path(self, file: str) -> str | None:
-
-        if not self.matches(file):
-            return None
-
-        for child in self.children:
-            child.captures = {**self.captures}
-            child_path = child.get_path(file)
-            if child_path is not None:
-                self.captures.update(child.captures)
-                return child_path   # deeper match found
-
-        resolved_path = self.resolve_structural_placeholders()
-        resolved_path = self.resolve_template(resolved_path)
-
-        # print("CAPTURES:", self.captures)
-        # print("PATH TEMPLATE:", self.path)
-        # print(resolved_path)
-        return resolved_path
+        keys = [tuple(PLACEHOLDER_RE.findall(template)) for template in resolved_templates]
+        literals = [
+            max((normalize_literal(text) for text in PLACEHOLDER_RE.split(template)[::2]), key=len)
+            for template in resolved_templates
+        ]
+
+        # A template that extends the parent's tag can only match where the parent's tag matched
+        parent_tag = self.parent.resolve_tag_templates()[0] if self.parent else None
+        anchored = [parent_tag is not None and template.startswith(parent_tag) for template in resolved_templates]
+
+        return CompiledRule(
+            name=self.name,
+            patterns=tuple(zip(patterns, keys)),
+            literals=tuple(literals),
+            path_parts=split_path_template(self.resolve_structural_placeholders()),
+            children=tuple(child.compile() for child in self.children),
+            anchored=tuple(anchored),
+        )
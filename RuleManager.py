@@ -1,19 +1,247 @@
+import os
+import re
+import threading
+from collections import OrderedDict, deque
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
 from Rule import Rule
+from CompiledRule import CompiledRule
+from MatchResult import MatchResult
+from TagAutomaton import TagAutomaton, normalize_literal
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# Below this many names, classify_many() runs in-process: starting a pool costs more than it saves
+PARALLEL_THRESHOLD = 5000
+DEFAULT_CHUNKSIZE = 1000
+# Distinct filename shapes remembered by match(); each entry is a shape string and a short tuple
+SHAPE_CACHE_SIZE = 4096
+
+DIGITS_RE = re.compile(r"\d+")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Per-process manager, installed once by the pool initializer
+_worker_manager: "RuleManager | None" = None
+
+
+def _init_worker(compiled: list[CompiledRule]):
+    global _worker_manager
+    _worker_manager = RuleManager.from_compiled(compiled)
+
+
+def iter_patterns(rule: CompiledRule) -> Iterator[re.Pattern]:
+    for pattern, _ in rule.patterns:
+        yield pattern
+    for child in rule.children:
+        yield from iter_patterns(child)
+
+
+def find_digit_literals(compiled: Iterable[CompiledRule]) -> set[str]:
+    """
+    Returns every digit run written literally in a pattern, e.g. '2004' for 'SYSC 2004 Lab <N>'.
+    """
+    return {run for rule in compiled for pattern in iter_patterns(rule) for run in DIGITS_RE.findall(pattern.pattern)}
+
+
+def _classify_chunk(names: list[str]) -> list[str | None]:
+    return [_worker_manager.get_path(name) for name in names]  # type: ignore
 
 
 class RuleManager:
     rules: list[Rule]
+    compiled: list[CompiledRule]
 
     def __init__(self) -> None:
         self.rules = []
+        self.compiled = []
+        self.automaton: TagAutomaton | None = None
+        self.unfiltered: list[int] = []
+        # Digit runs that appear literally in some pattern (e.g. '2004' in 'SYSC 2004'); see shape()
+        self.digit_literals: set[str] = set()
+        self.cache_size = SHAPE_CACHE_SIZE
+        self.shape_cache: OrderedDict[str, tuple[int, tuple[str, ...]] | None] = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Called with the name of every top-level rule match() evaluates (see Profiler.instrument_rules)
+        self.on_evaluate: Callable[[str], None] | None = None
+
+    @classmethod
+    def from_compiled(cls, compiled: list[CompiledRule]) -> "RuleManager":
+        """
+        Builds a manager directly from compiled rule trees, e.g. in a worker process.
+        The source Rule objects are not available, so rules is left empty.
+        """
+        manager = cls()
+        manager.compiled = list(compiled)
+        manager.digit_literals = find_digit_literals(manager.compiled)
+        return manager
 
     def add(self, rule: Rule):
+        """
+        Adds a fully built rule tree. The tree is compiled here, so children
+        must be attached before the rule is added.
+        """
         self.rules.append(rule)
+        self.compiled.append(rule.compile())
+        self.automaton = None
+        # The new rule can change which chain a shape matches, and which digits matter
+        self.digit_literals |= find_digit_literals(self.compiled[-1:])
+        self.cache_clear()
+
+    def build_prefilter(self):
+        """
+        Builds one automaton over the literal tags and aliases of every top-level rule.
+        Rules with a pattern that has no literal text can't be filtered and are always evaluated.
+        """
+        automaton = TagAutomaton()
+        unfiltered: list[int] = []
+        for index, rule in enumerate(self.compiled):
+            if not all(rule.literals):
+                unfiltered.append(index)
+                continue
+            for literal in rule.literals:
+                automaton.add(literal, index)
+
+        automaton.build()
+        # Assign the automaton last: it is what other threads check before using the prefilter
+        self.unfiltered = unfiltered
+        self.automaton = automaton
+
+    def candidates(self, file: str) -> list[int]:
+        """
+        Returns the indices of the top-level rules that can possibly match the file, highest first.
+        """
+        if self.automaton is None:
+            self.build_prefilter()
+
+        found = self.automaton.search(normalize_literal(file))  # type: ignore
+        found.update(self.unfiltered)
+        return sorted(found, reverse=True)
+
+    def shape(self, file: str) -> str:
+        """
+        Returns the filename with everything the rules can't tell apart abstracted away:
+        'SYSC 2004  Lab 3.pdf' → 'sysc 2004 lab #.pdf'.
+        Patterns ignore case and match any run of whitespace, and digits only matter to them through
+        <N> captures or digit literals, so a digit run containing no digit literal becomes '#'.
+        Files with the same shape match the same rule chain.
+        """
+        literals = self.digit_literals
+
+        def digits(match: re.Match) -> str:
+            run = match.group()
+            return run if any(literal in run for literal in literals) else "#"
+
+        return DIGITS_RE.sub(digits, WHITESPACE_RE.sub(" ", file.lower()))
+
+    def match(self, file: str) -> MatchResult | None:
+        """
+        Classifies a file without mutating any rule, so one manager can be shared across threads.
+        The rule chain found for each filename shape is cached, so another file of the same shape
+        only has to search that chain again for its captures.
+        """
+        if self.automaton is None:
+            self.build_prefilter()
+
+        key = self.shape(file)
+        with self.cache_lock:
+            cached = self.shape_cache.get(key, False)
+            if cached is not False:
+                self.shape_cache.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if cached is None:
+            return None
+        if cached is not False:
+            result = self.replay(file, *cached)  # type: ignore
+            if result is not None:
+                return result
+
+        # The last matching rule wins, so evaluate candidates from the end and stop at the first hit
+        found = None
+        for index in self.candidates(file):
+            if self.on_evaluate is not None:
+                self.on_evaluate(self.compiled[index].name)
+            result = self.compiled[index].match(file)
+            if result is not None:
+                found = (index, result.rules)
+                break
+        else:
+            result = None
+
+        with self.cache_lock:
+            self.shape_cache[key] = found
+            if len(self.shape_cache) > self.cache_size:
+                self.shape_cache.popitem(last=False)
+        return result
+
+    def replay(self, file: str, index: int, names: tuple[str, ...]) -> MatchResult | None:
+        """
+        Re-extracts the captures of a cached rule chain for a file of the same shape.
+        Returns None if the chain doesn't match after all, so the caller falls back to a full match.
+        """
+        rule = self.compiled[index]
+        captures: dict[str, str] = {}
+        anchor = None
+        for depth, name in enumerate(names):
+            if depth:
+                rule = next(child for child in rule.children if child.name == name)
+            found = rule.search(file, anchor)
+            if found is None:
+                return None
+            own, anchor = found
+            captures.update(own)
+        return MatchResult(names, tuple(captures.items()), rule.fill_path(captures))
+
+    def cache_clear(self):
+        with self.cache_lock:
+            self.shape_cache.clear()
+            self.hits = 0
+            self.misses = 0
 
     def get_path(self, file: str) -> str | None:
-        best = None
-        for rule in self.rules:
-            path = rule.get_path(file)
-            if path is not None:
-                best = path
-        return best
+        result = self.match(file)
+        return result.path if result is not None else None
+
+    def classify_many(self, names: Iterable[str], workers: int | None = None,
+                      chunksize: int = DEFAULT_CHUNKSIZE,
+                      parallel_threshold: int = PARALLEL_THRESHOLD) -> Iterator[tuple[str, str | None]]:
+        """
+        Streams (name, path) for every name, in input order.
+        Large inputs are split into chunks and fanned out over a process pool; each worker
+        receives the compiled rules once, when it starts. Inputs shorter than
+        parallel_threshold, or workers=1, are classified in-process.
+        """
+        names = iter(names)
+        head = list(islice(names, parallel_threshold))
+        workers = workers or os.cpu_count() or 1
+
+        if len(head) < parallel_threshold or workers == 1:
+            for name in chain(head, names):
+                yield name, self.get_path(name)
+            return
+
+        # Imported here so single-file and headless runs don't pay for multiprocessing at startup
+        from concurrent.futures import ProcessPoolExecutor
+
+        names = chain(head, names)
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.compiled,))
+        pending: deque[tuple[list[str], "Future"]] = deque()
+        try:
+            while chunk := list(islice(names, chunksize)):
+                pending.append((chunk, pool.submit(_classify_chunk, chunk)))
+                # Bound the number of chunks in flight so memory stays flat on huge inputs
+                if len(pending) >= workers * 2:
+                    done, future = pending.popleft()
+                    yield from zip(done, future.result())
+
+            while pending:
+                done, future = pending.popleft()
+                yield from zip(done, future.result())
+        finally:
+            pool.shutdown(cancel_futures=True)
@@ -1,8 +1,64 @@
+import hashlib
 import json
+import os
+import pickle
+import sys
+from typing import Callable, Iterable
+
 from Rule import Rule
 from Keywords import *
 from RuleManager import RuleManager
 
+RULES_CACHE = "./rules.cache"
+# Bump whenever CompiledRule, TagAutomaton, literal normalization or how rules are built from
+# rules.json or courses.json change, so old cache files are ignored
+CACHE_VERSION = 3
+
+
+def cache_key(paths: Iterable[str | os.PathLike]) -> str:
+    """
+    Hashes the files rules are built from together with the cache format and Python version,
+    since pickles of compiled patterns are only trusted by the interpreter that wrote them.
+    """
+    digest = hashlib.sha256(f"{CACHE_VERSION}\0{sys.version}\0".encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_cached(key: str, build: Callable[[], RuleManager], cache_path: str | os.PathLike = RULES_CACHE) -> RuleManager:
+    """
+    Returns the compiled rules and prefilter stored in cache_path if they were written under key,
+    otherwise calls build() and rewrites the cache.
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            cached_key, compiled, automaton, unfiltered = pickle.load(f)
+        if cached_key == key:
+            rule_manager = RuleManager.from_compiled(compiled)
+            rule_manager.unfiltered = unfiltered
+            rule_manager.automaton = automaton
+            return rule_manager
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError, ImportError):
+        pass
+
+    rule_manager = build()
+    rule_manager.build_prefilter()
+
+    # Write to a temporary file first so a concurrent reader never sees a partial cache
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((key, rule_manager.compiled, rule_manager.automaton, rule_manager.unfiltered), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return rule_manager
+
 
 class RuleParser:
     filepath: str
@@ -23,6 +79,17 @@ class RuleParser:
 
         return rule_manager
 
+    def cache_key(self) -> str:
+        return cache_key([self.filepath])
+
+    def load(self, cache_path: str | os.PathLike = RULES_CACHE) -> RuleManager:
+        """
+        Like parse(), but reuses the compiled rules and prefilter from cache_path when it was
+        written for the same rules file; otherwise parses and rewrites the cache.
+        Loaded managers have no Rule objects (see RuleManager.from_compiled).
+        """
+        return load_cached(self.cache_key(), self.parse, cache_path)
+
     def _parse_rule(self, parent: Rule | None, rule_json: dict, name: str) -> Rule:
         tag = rule_json.get(TAG, "")
         aliases = rule_json.get(ALIASES, [])
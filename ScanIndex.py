@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, Callable, Iterable
+
+
+# Bump whenever the stored result format or how files are classified changes (rule generation,
+# matching), so results cached by older code are dropped even if the configuration files are the same
+INDEX_VERSION = 1
+
+
+def config_hash(paths: Iterable[str | os.PathLike]) -> str:
+    """
+    Hashes the contents of the configuration files that classification depends on,
+    together with INDEX_VERSION.
+    """
+    digest = hashlib.sha256(f"{INDEX_VERSION}\0".encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def in_scope(path: str, root: str | os.PathLike | None, max_depth: int | None) -> bool:
+    """
+    Whether walk_files(root, max_depth=max_depth) could yield path. No root means everything.
+    """
+    if root is None:
+        return True
+    prefix = os.path.join(root, "")
+    if not path.startswith(prefix):
+        return False
+    return max_depth is None or path.count(os.sep, len(prefix)) <= max_depth
+
+
+class ScanIndex:
+    """
+    On-disk cache of classification results keyed on (path, size, mtime_ns).
+    The whole index is loaded into memory on open and new results are written back in one
+    transaction by save(). If the configuration hash differs from the stored one, every
+    entry is dropped.
+    """
+
+    entries: dict[str, tuple[int, int, Any]]
+
+    def __init__(self, db_path: str | os.PathLike, config: str) -> None:
+        self.db_path = db_path
+        self.config = config
+        self.entries = {}
+        self.changed: dict[str, tuple[int, int, Any]] = {}
+        self.seen: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS entries (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                result TEXT NOT NULL
+            );
+        """)
+
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'config'").fetchone()
+        if row is None or row[0] != config:
+            with self.connection:
+                self.connection.execute("DELETE FROM entries")
+                self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('config', ?)", (config,))
+        else:
+            for path, size, mtime_ns, result in self.connection.execute("SELECT path, size, mtime_ns, result FROM entries"):
+                self.entries[path] = (size, mtime_ns, json.loads(result))
+
+    def __enter__(self) -> "ScanIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Any | None:
+        self.seen.add(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == size and entry[1] == mtime_ns:
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return None
+
+    def put(self, path: str, size: int, mtime_ns: int, result: Any):
+        """
+        Records a result. Results must be JSON serializable and not None.
+        """
+        self.seen.add(path)
+        self.entries[path] = self.changed[path] = (size, mtime_ns, result)
+
+    def classify(self, entry: os.DirEntry, classify: Callable[[str], Any]) -> Any:
+        """
+        Returns the cached result for the entry, or classifies its name and records the result.
+        """
+        stat = entry.stat()
+        result = self.get(entry.path, stat.st_size, stat.st_mtime_ns)
+        if result is None:
+            result = classify(entry.name)
+            self.put(entry.path, stat.st_size, stat.st_mtime_ns, result)
+        return result
+
+    def save(self, prune: bool = True, root: str | os.PathLike | None = None, max_depth: int | None = None):
+        """
+        Writes new and changed results. With prune, entries for paths not seen since
+        opening the index are removed, so deleted files don't accumulate.
+        root and max_depth limit pruning to what the walk could have seen, so a shallow walk
+        doesn't drop the entries of a deeper one sharing the index.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO entries (path, size, mtime_ns, result) VALUES (?, ?, ?, ?)",
+                [(path, size, mtime_ns, json.dumps(result)) for path, (size, mtime_ns, result) in self.changed.items()],
+            )
+            if prune:
+                stale = [path for path in self.entries
+                         if path not in self.seen and in_scope(path, root, max_depth)]
+                self.connection.executemany("DELETE FROM entries WHERE path = ?", [(path,) for path in stale])
+                for path in stale:
+                    del self.entries[path]
+        self.changed.clear()
+
+    def close(self):
+        self.connection.close()
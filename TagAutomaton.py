@@ -0,0 +1,79 @@
+from collections import deque
+
+
+# IGNORECASE matches 'ı' and 'İ' to 'i', but casefold() leaves 'ı' alone and turns 'İ' into 'i' + U+0307
+DOTTED_I = str.maketrans({"ı": "i", "İ": "i"})
+
+
+def normalize_literal(text: str) -> str:
+    """
+    Folds case and collapses whitespace runs, matching how tag regexes treat
+    case (IGNORECASE) and spaces (\\s+).
+    """
+    return " ".join(text.translate(DOTTED_I).casefold().split())
+
+
+class TagAutomaton:
+    """
+    Aho-Corasick automaton over literal tags.
+    One pass over a text reports the value of every literal that occurs in it.
+    """
+
+    goto: list[dict[str, int]]
+    fail: list[int]
+    output: list[set[int]]
+
+    def __init__(self) -> None:
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+        self.built = True
+
+    def add(self, literal: str, value: int):
+        state = 0
+        for char in literal:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(set())
+                self.goto[state][char] = next_state
+            state = next_state
+        self.output[state].add(value)
+        self.built = False
+
+    def build(self):
+        """
+        Computes failure links breadth-first. Called automatically by search().
+        """
+        queue = deque(self.goto[0].values())
+        for state in queue:
+            self.fail[state] = 0
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] |= self.output[self.fail[next_state]]
+
+        self.built = True
+
+    def search(self, text: str) -> set[int]:
+        if not self.built:
+            self.build()
+
+        goto, fail, output = self.goto, self.fail, self.output
+        found: set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
@@ -0,0 +1,27 @@
+import unittest
+from pathlib import Path
+
+from Course import Course
+from CourseIndex import CourseIndex, normalize_course_code
+
+COURSE_JSON = {"name": "Programming", "section": "A", "crn": "1", "folders": ["LAB"]}
+
+
+class TestCourseIndex(unittest.TestCase):
+    def setUp(self):
+        self.course = Course("SYSC2004", COURSE_JSON, Path("./02_Second_Year/WINTER"))
+        self.index = CourseIndex()
+        self.index.add(self.course)
+
+    def test_normalize_course_code(self):
+        for code in ["SYSC2004", "SYSC 2004", "sysc_2004", "SYSC-2004", "Sysc  2004"]:
+            self.assertEqual(normalize_course_code(code), "SYSC2004")
+
+    def test_get(self):
+        self.assertIs(self.index.get("sysc 2004"), self.course)
+        self.assertIsNone(self.index.get("MATH1005"))
+        self.assertIn("SYSC_2004", self.index)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from course_rules import build_course_rules, course_code_spellings, load_course_rules
+from scanner import scan_rules
+from ScanIndex import ScanIndex
+
+COURSES = {
+    "01_First_Year": {
+        "FALL": {
+            "SYSC2004": {"name": "Programming", "crn": "1", "section": "A", "folders": ["LAB", "ASSIGNMENT", "INFO"]},
+        },
+    },
+    "02_Second_Year": {
+        "WINTER": {
+            "ELEC2501": {"name": "Circuits", "crn": "2", "section": "B", "folders": ["LECTURE", "PASS"]},
+        },
+    },
+}
+
+
+class TestCourseRules(unittest.TestCase):
+    def setUp(self):
+        self.ruleManager = build_course_rules(COURSES)
+
+    def test_spellings(self):
+        self.assertEqual(course_code_spellings("sysc 2004"), ["SYSC 2004", "SYSC2004", "SYSC_2004", "SYSC-2004"])
+
+    def test_full_destination_in_one_pass(self):
+        result = self.ruleManager.match("SYSC_2004 Lab 3.pdf")
+        self.assertEqual(result.rules, ("SYSC2004", "Lab"))
+        self.assertEqual(result.path, "./01_First_Year/FALL/Programming/Lab")
+
+    def test_folder_match_ignores_case(self):
+        self.assertEqual(self.ruleManager.get_path("sysc2004 LAB 3.pdf"), "./01_First_Year/FALL/Programming/Lab")
+        self.assertEqual(self.ruleManager.get_path("SYSC-2004 assignment 1.pdf"), "./01_First_Year/FALL/Programming/Assignment")
+
+    def test_folder_matches_word_start(self):
+        self.assertEqual(self.ruleManager.get_path("SYSC 2004 Syllabus.pdf"), "./01_First_Year/FALL/Programming")
+        self.assertEqual(self.ruleManager.get_path("ELEC 2501 compass.pdf"), "./02_Second_Year/WINTER/Circuits")
+        self.assertEqual(self.ruleManager.get_path("ELEC 2501 PASS 2.pdf"), "./02_Second_Year/WINTER/Circuits/Pass")
+        self.assertEqual(self.ruleManager.get_path("SYSC2004_Lab3.pdf"), "./01_First_Year/FALL/Programming/Lab")
+
+    def test_folder_matches_plurals(self):
+        self.assertEqual(self.ruleManager.get_path("SYSC 2004 Labs overview.pdf"), "./01_First_Year/FALL/Programming/Lab")
+        self.assertEqual(self.ruleManager.get_path("SYSC2004 Assignments.zip"),
+                         "./01_First_Year/FALL/Programming/Assignment")
+        self.assertEqual(self.ruleManager.get_path("ELEC 2501 Lectures 1-3.pdf"),
+                         "./02_Second_Year/WINTER/Circuits/Lecture")
+        self.assertEqual(self.ruleManager.get_path("ELEC 2501 LectureNotes.pdf"),
+                         "./02_Second_Year/WINTER/Circuits/Lecture")
+
+    def test_no_folder_goes_to_course(self):
+        self.assertEqual(self.ruleManager.get_path("SYSC 2004 Notes.pdf"), "./01_First_Year/FALL/Programming")
+
+    def test_only_course_folders(self):
+        # Lecture is a folder of ELEC 2501 only
+        self.assertEqual(self.ruleManager.get_path("SYSC 2004 Lecture 1.pdf"), "./01_First_Year/FALL/Programming")
+        self.assertEqual(self.ruleManager.get_path("ELEC 2501 Lecture 1.pdf"), "./02_Second_Year/WINTER/Circuits/Lecture")
+
+    def test_year_filter(self):
+        ruleManager = build_course_rules(COURSES, ["02_Second_Year"])
+        self.assertIsNone(ruleManager.get_path("SYSC 2004 Lab 1.pdf"))
+        self.assertIsNotNone(ruleManager.get_path("ELEC 2501 Lecture 1.pdf"))
+
+    def test_load_course_rules(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            courses = Path(tmp).joinpath("courses.json")
+            courses.write_text(json.dumps(COURSES))
+            year_to_folder = Path(tmp).joinpath("year_to_folder.json")
+            year_to_folder.write_text(json.dumps({"2": "02_Second_Year"}))
+            cache = Path(tmp).joinpath("rules.cache")
+
+            built = load_course_rules(courses, year_to_folder, cache)
+            cached = load_course_rules(courses, year_to_folder, cache)
+            self.assertEqual((len(built.rules), len(cached.rules)), (1, 0))  # the second load came from the cache
+            for ruleManager in (built, cached):
+                self.assertIsNone(ruleManager.get_path("SYSC 2004 Lab 1.pdf"))
+                self.assertEqual(ruleManager.get_path("ELEC 2501 Lecture 1.pdf"),
+                                 "./02_Second_Year/WINTER/Circuits/Lecture")
+
+            year_to_folder.write_text(json.dumps({"1": "01_First_Year"}))
+            self.assertIsNotNone(load_course_rules(courses, year_to_folder, cache).get_path("SYSC 2004 Lab 1.pdf"))
+
+    def test_scan_rules_cached_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp).joinpath("src")
+            src.mkdir()
+            src.joinpath("SYSC2004 Lab 1.pdf").write_text("lab")
+            src.joinpath("photo.png").write_text("photo")
+
+            for _ in range(2):  # cold, then from the index
+                with ScanIndex(Path(tmp).joinpath("index.sqlite3"), "config") as index:
+                    found = [(entry.name, result) for entry, result in scan_rules(src, self.ruleManager, index)]
+                    index.save()
+                self.assertEqual(found, [("SYSC2004 Lab 1.pdf", self.ruleManager.match("SYSC2004 Lab 1.pdf"))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from file_walker import walk_files
+
+
+class TestFileWalker(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for file in ["a.pdf", ".hidden.pdf", "sub/b.pdf", "sub/deeper/c.pdf", "skip/d.pdf", "sub/e.part"]:
+            path = self.root.joinpath(file)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def walk(self, **kwargs) -> set[str]:
+        return {Path(entry.path).relative_to(self.root).as_posix() for entry in walk_files(self.root, **kwargs)}
+
+    def test_walk_all(self):
+        self.assertEqual(self.walk(skip_hidden=False),
+                         {"a.pdf", ".hidden.pdf", "sub/b.pdf", "sub/deeper/c.pdf", "skip/d.pdf", "sub/e.part"})
+
+    def test_skip_hidden(self):
+        self.assertNotIn(".hidden.pdf", self.walk())
+
+    def test_exclude(self):
+        self.assertEqual(self.walk(exclude=["skip", "*.part"]), {"a.pdf", "sub/b.pdf", "sub/deeper/c.pdf"})
+
+    def test_max_depth(self):
+        self.assertEqual(self.walk(max_depth=0), {"a.pdf"})
+        self.assertEqual(self.walk(max_depth=1), {"a.pdf", "sub/b.pdf", "skip/d.pdf", "sub/e.part"})
+
+    def test_cancel(self):
+        cancel = threading.Event()
+        walked = []
+        for entry in walk_files(self.root, cancel=cancel):
+            walked.append(entry)
+            cancel.set()
+        self.assertEqual(len(walked), 1)
+
+    def test_deep_tree(self):
+        path = self.root
+        for i in range(200):
+            path = path.joinpath("d")
+            path.mkdir()
+        path.joinpath("deep.pdf").write_text("x")
+
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(100)
+        try:
+            names = {entry.name for entry in walk_files(self.root)}
+        finally:
+            sys.setrecursionlimit(limit)
+
+        self.assertIn("deep.pdf", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
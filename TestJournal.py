@@ -0,0 +1,88 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from journal import MoveJournal, resume, undo
+from mover import MoveStatus
+from MoveExecutor import MoveExecutor
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = Path(self.tmp.name, "src")
+        self.dst = Path(self.tmp.name, "dst")
+        self.src.mkdir()
+        self.dst.mkdir()
+        self.journal = MoveJournal(Path(self.tmp.name, "journal.ndjson"))
+        self.moves = []
+        for n in range(5):
+            file = self.src.joinpath(f"{n}.pdf")
+            file.write_text(str(n))
+            self.moves.append((file, self.dst.joinpath(f"{n}.pdf")))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_execute_records_batch(self):
+        results = list(self.journal.execute(MoveExecutor(), self.moves))
+        self.assertTrue(all(result.status == MoveStatus.MOVED for result in results))
+
+        (batch,) = self.journal.read().values()
+        self.assertTrue(batch.ended)
+        self.assertEqual(batch.intents, self.moves)
+        self.assertEqual(batch.unfinished(), [])
+
+    def test_resume_interrupted_batch(self):
+        results = self.journal.execute(MoveExecutor(workers=1), self.moves)
+        next(results)
+        results.close()  # interrupted after the first recorded completion
+
+        (batch,) = self.journal.read().values()
+        self.assertFalse(batch.ended)
+        self.assertEqual(len(batch.unfinished()), 4)
+
+        resumed = list(resume(self.journal, MoveExecutor()))
+        self.assertEqual(len(resumed), 4)
+        self.assertTrue(all(result.status == MoveStatus.MOVED for result in resumed))
+        self.assertEqual(sorted(file.name for file in self.dst.iterdir()), [f"{n}.pdf" for n in range(5)])
+        self.assertTrue(all(batch.ended for batch in self.journal.read().values()))
+
+    def test_cancelled_batch_stays_open(self):
+        cancel = threading.Event()
+        results = []
+        for result in self.journal.execute(MoveExecutor(workers=1, cancel=cancel), self.moves):
+            results.append(result)
+            cancel.set()
+
+        moved = [result for result in results if result.status == MoveStatus.MOVED]
+        (batch,) = self.journal.read().values()
+        self.assertFalse(batch.ended)
+        self.assertEqual(len(batch.unfinished()), 5 - len(moved))
+
+        list(resume(self.journal, MoveExecutor()))
+        self.assertEqual(sorted(file.name for file in self.dst.iterdir()), [f"{n}.pdf" for n in range(5)])
+
+    def test_undo(self):
+        list(self.journal.execute(MoveExecutor(), self.moves))
+        results = list(undo(self.journal, MoveExecutor()))
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(sorted(file.name for file in self.src.iterdir()), [f"{n}.pdf" for n in range(5)])
+        self.assertEqual(list(self.dst.iterdir()), [])
+
+        # The batch is already undone, so there is nothing left to undo
+        self.assertEqual(list(undo(self.journal, MoveExecutor())), [])
+
+    def test_torn_line_is_ignored(self):
+        list(self.journal.execute(MoveExecutor(), self.moves[:1]))
+        with open(self.journal.path, "a") as f:
+            f.write('{"type": "done", "bat')
+
+        (batch,) = self.journal.read().values()
+        self.assertTrue(batch.ended)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from mover import MoveStatus
+from MoveExecutor import MoveExecutor, MoveResult
+
+
+class TestMoveExecutor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = Path(self.tmp.name, "src")
+        self.dst = Path(self.tmp.name, "dst")
+        self.src.mkdir()
+        self.dst.mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_results_in_input_order(self):
+        moves = []
+        for n in range(100):
+            file = self.src.joinpath(f"{n}.pdf")
+            file.write_text(str(n))
+            moves.append((file, self.dst.joinpath(f"{n}.pdf")))
+
+        results = list(MoveExecutor(workers=4, per_folder=2).run(moves))
+
+        self.assertEqual([result.src for result in results], [src for src, _ in moves])
+        self.assertTrue(all(result.status == MoveStatus.MOVED for result in results))
+        self.assertEqual(len(list(self.dst.iterdir())), 100)
+
+    def test_outcomes(self):
+        exists = self.src.joinpath("exists.pdf")
+        exists.write_text("a")
+        self.dst.joinpath("exists.pdf").write_text("b")
+        new_folder = [self.src.joinpath(f"new{n}.pdf") for n in range(3)]
+        for file in new_folder:
+            file.write_text("c")
+
+        asked: list[Path] = []
+
+        def confirm(folder: Path) -> bool:
+            asked.append(folder)
+            return True
+
+        moves = [(exists, self.dst.joinpath("exists.pdf")), (self.src.joinpath("missing.pdf"), self.dst.joinpath("missing.pdf"))]
+        moves += [(file, self.dst.joinpath("New", file.name)) for file in new_folder]
+        results = list(MoveExecutor(confirm_create=confirm).run(moves))
+
+        self.assertEqual([result.status for result in results], [
+            MoveStatus.SKIPPED_EXISTS, MoveStatus.MISSING_SRC, MoveStatus.MOVED, MoveStatus.MOVED, MoveStatus.MOVED])
+        self.assertEqual(asked, [self.dst.joinpath("New")])
+
+    def test_declined_folder(self):
+        file = self.src.joinpath("a.pdf")
+        file.write_text("a")
+        results = list(MoveExecutor(confirm_create=lambda folder: False).run([(file, self.dst.joinpath("New", "a.pdf"))]))
+        self.assertEqual(results[0].status, MoveStatus.MISSING_FOLDER)
+        self.assertTrue(file.exists())
+
+
+    def test_cancel_reports_every_move_that_ran(self):
+        moves = []
+        for n in range(200):
+            file = self.src.joinpath(f"{n}.pdf")
+            file.write_text(str(n))
+            moves.append((file, self.dst.joinpath(f"{n}.pdf")))
+
+        cancel = threading.Event()
+        results = []
+        for result in MoveExecutor(workers=8, cancel=cancel).run(moves):
+            results.append(result)
+            if len(results) == 5:
+                cancel.set()
+
+        self.assertLess(len(results), 200)
+        self.assertEqual([result.src for result in results], [src for src, _ in moves[:len(results)]])
+        moved = [result.dst.name for result in results if result.status == MoveStatus.MOVED]
+        self.assertEqual(sorted(file.name for file in self.dst.iterdir()), sorted(moved))
+        self.assertTrue(all(result.status in (MoveStatus.MOVED, MoveStatus.CANCELLED) for result in results))
+
+    def test_busy_folder_does_not_hold_workers(self):
+        finished: list[str] = []
+
+        class SlowExecutor(MoveExecutor):
+            def move(self, src: Path, dst: Path):
+                if dst.parent.name == "A":
+                    time.sleep(0.05)
+                finished.append(dst.parent.name)
+                return MoveResult(src, dst, MoveStatus.MOVED)
+
+        moves = [(self.src.joinpath(f"{n}.pdf"), self.dst.joinpath("A", f"{n}.pdf")) for n in range(16)]
+        moves += [(self.src.joinpath(f"{n}.pdf"), self.dst.joinpath("B", f"{n}.pdf")) for n in range(4)]
+        results = list(SlowExecutor(workers=8, per_folder=4).run(moves))
+
+        self.assertEqual([result.dst for result in results], [dst for _, dst in moves])
+        # B's moves run on the workers A can't use instead of queueing behind A
+        self.assertEqual(finished[:4], ["B"] * 4)
+
+if __name__ == "__main__":
+    unittest.main()
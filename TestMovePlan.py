@@ -0,0 +1,54 @@
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from mover import MoveStatus
+from MovePlan import PlanEntry, read_plan, revalidate_plan, write_plan
+from MovePlanner import Collision
+
+
+class TestMovePlan(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.dst = self.root.joinpath("dst")
+        self.dst.mkdir()
+        self.entries = []
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            src = self.root.joinpath(name)
+            src.write_text(name)
+            stat = os.stat(src)
+            self.entries.append(PlanEntry(src, self.dst.joinpath(name), ("Course", "Lab"), stat.st_size, stat.st_mtime_ns))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        f = io.StringIO()
+        self.assertEqual(write_plan(f, self.entries), 3)
+        f.seek(0)
+        self.assertEqual(list(read_plan(f)), self.entries)
+
+    def test_split_plan_without_header(self):
+        f = io.StringIO()
+        write_plan(f, self.entries)
+        lines = f.getvalue().splitlines(keepends=True)
+        chunks = [io.StringIO("".join(lines[:2])), io.StringIO("".join(lines[2:]))]
+        self.assertEqual([entry for chunk in chunks for entry in read_plan(chunk)], self.entries)
+
+    def test_unknown_version(self):
+        with self.assertRaises(ValueError):
+            list(read_plan(io.StringIO('{"plan": 99}\n')))
+
+    def test_revalidate(self):
+        self.entries[1].src.write_text("changed since planning")
+        self.entries[2].src.unlink()
+
+        planned = {planned.src.name: planned.status for planned in revalidate_plan(self.entries, Collision.SKIP)}
+        self.assertEqual(planned, {"a.pdf": None, "b.pdf": MoveStatus.CHANGED, "c.pdf": MoveStatus.MISSING_SRC})
+
+
+if __name__ == "__main__":
+    unittest.main()
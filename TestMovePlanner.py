@@ -0,0 +1,114 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from duplicates import BLOCK_SIZE, DuplicateFinder, HashCache
+from mover import MoveStatus
+from MovePlanner import Collision, MovePlanner
+
+
+class TestMovePlanner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.dst = self.root.joinpath("dst")
+        self.dst.mkdir()
+        self.dst.joinpath("Lab 1.pdf").write_text("old")
+        self.src = self.root.joinpath("Lab 1.pdf")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_skip_collision(self):
+        (planned,) = MovePlanner(Collision.SKIP).plan([(self.src, self.dst.joinpath("Lab 1.pdf"))])
+        self.assertEqual(planned.status, MoveStatus.SKIPPED_EXISTS)
+        self.assertFalse(planned.ready)
+
+    def test_suffix_collision(self):
+        self.dst.joinpath("Lab 1 (1).pdf").write_text("old")
+        other = self.root.joinpath("other", "Lab 1.pdf")
+        plan = MovePlanner(Collision.SUFFIX).plan([
+            (self.src, self.dst.joinpath("Lab 1.pdf")),
+            (other, self.dst.joinpath("Lab 1.pdf")),
+        ])
+        self.assertEqual([planned.dst.name for planned in plan], ["Lab 1 (2).pdf", "Lab 1 (3).pdf"])
+        self.assertTrue(all(planned.ready for planned in plan))
+
+    def test_missing_folders_confirmed_once(self):
+        asked: list[list[Path]] = []
+
+        def confirm(folders: list[Path]) -> bool:
+            asked.append(folders)
+            return True
+
+        moves = [(self.src, self.dst.joinpath("B", "x.pdf")), (self.src, self.dst.joinpath("A", "y.pdf")),
+                 (self.src, self.dst.joinpath("A", "z.pdf"))]
+        plan = MovePlanner().plan(moves, confirm)
+
+        self.assertEqual(asked, [[self.dst.joinpath("A"), self.dst.joinpath("B")]])
+        self.assertTrue(self.dst.joinpath("A").is_dir() and self.dst.joinpath("B").is_dir())
+        self.assertTrue(all(planned.ready for planned in plan))
+
+    def test_missing_folders_declined(self):
+        (planned,) = MovePlanner().plan([(self.src, self.dst.joinpath("A", "x.pdf"))], lambda folders: False)
+        self.assertEqual(planned.status, MoveStatus.MISSING_FOLDER)
+        self.assertFalse(self.dst.joinpath("A").exists())
+
+
+class TestDuplicates(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: bytes) -> Path:
+        path = self.root.joinpath(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return path
+
+    def test_is_duplicate(self):
+        big = bytes(range(256)) * (BLOCK_SIZE // 64)
+        middle_changed = bytearray(big)
+        middle_changed[len(big) // 2] ^= 1
+
+        finder = DuplicateFinder()
+        self.assertTrue(finder.is_duplicate(self.write("a", b"abc"), self.write("b", b"abc")))
+        self.assertFalse(finder.is_duplicate(self.write("c", b"abc"), self.write("d", b"abd")))
+        self.assertFalse(finder.is_duplicate(self.write("e", b"abc"), self.write("f", b"abcd")))
+        self.assertTrue(finder.is_duplicate(self.write("g", big), self.write("h", big)))
+        self.assertFalse(finder.is_duplicate(self.write("i", big), self.write("j", bytes(middle_changed))))
+        self.assertEqual(finder.find([(self.root / "a", self.root / "b"), (self.root / "c", self.root / "d")]), [True, False])
+
+    def test_hash_cache(self):
+        a, b = self.write("a", b"abc"), self.write("b", b"abc")
+        with HashCache(self.root.joinpath("cache.sqlite3")) as cache:
+            DuplicateFinder(cache).is_duplicate(a, b)
+            cache.save()
+
+        with HashCache(self.root.joinpath("cache.sqlite3")) as cache:
+            stat = a.stat()
+            self.assertIsNotNone(cache.get(str(a), "edges", stat.st_size, stat.st_mtime_ns))
+            self.assertIsNone(cache.get(str(a), "edges", stat.st_size + 1, stat.st_mtime_ns))
+
+    def test_planner_marks_duplicates(self):
+        src = self.write("Downloads/Lab 1.pdf", b"same")
+        other = self.write("Downloads/other/Lab 2.pdf", b"new")
+        dst = self.root.joinpath("dst")
+        self.write("dst/Lab 1.pdf", b"same")
+        self.write("dst/Lab 2.pdf", b"old")
+
+        plan = MovePlanner(Collision.SUFFIX, DuplicateFinder()).plan([
+            (src, dst.joinpath("Lab 1.pdf")),
+            (other, dst.joinpath("Lab 2.pdf")),
+        ])
+
+        self.assertEqual(plan[0].status, MoveStatus.DUPLICATE)
+        self.assertTrue(plan[1].ready)
+        self.assertEqual(plan[1].dst.name, "Lab 2 (1).pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from pathlib import Path
+
+from PayloadStore import PayloadStore
+
+
+class TestPayloadStore(unittest.TestCase):
+    def setUp(self):
+        self.store = PayloadStore()
+        self.lab = self.store.add("/dl/SYSC2004 Lab 1.pdf", "/uni/Programming/Lab/SYSC2004 Lab 1.pdf",
+                                  "SYSC2004", "02_Second_Year", "Lab")
+        self.notes = self.store.add("/dl/ELEC2501 notes.pdf", "/uni/Circuits/ELEC2501 notes.pdf",
+                                    "ELEC2501", "02_Second_Year")
+        self.lab2 = self.store.add("/dl/SYSC2004 Lab 2.pdf", "/uni/Programming/Lab/SYSC2004 Lab 2.pdf",
+                                   "SYSC2004", "02_Second_Year", "Lab")
+
+    def test_paths(self):
+        self.assertEqual(self.lab.src, Path("/dl/SYSC2004 Lab 1.pdf"))
+        self.assertEqual(self.lab.dst, Path("/uni/Programming/Lab/SYSC2004 Lab 1.pdf"))
+        self.assertIs(self.lab.src_dir, self.lab2.src_dir)  # interned
+        self.assertFalse(hasattr(self.lab, "__dict__"))
+
+        self.lab.dst = Path("/uni/Programming/Lab/SYSC2004 Lab 1 (1).pdf")
+        self.assertEqual(self.lab.dst.name, "SYSC2004 Lab 1 (1).pdf")
+        self.assertEqual(self.lab.src.name, "SYSC2004 Lab 1.pdf")
+
+    def test_lookup_and_order(self):
+        self.assertIs(self.store.get(self.notes.id), self.notes)
+        self.assertEqual(list(self.store), [self.lab, self.notes, self.lab2])
+        self.assertIs(self.store[2], self.lab2)
+        self.assertEqual(len(self.store), 3)
+
+    def test_groupings(self):
+        self.assertEqual(self.store.in_courses(["SYSC2004"]), [self.lab, self.lab2])
+        self.assertEqual(self.store.in_courses(["ELEC2501", "MATH1004"]), [self.notes])
+        self.assertEqual(self.store.by_folder["Lab"], [self.lab, self.lab2])
+        self.assertEqual(self.store.by_folder[None], [self.notes])
+        self.assertEqual(len(self.store.by_year["02_Second_Year"]), 3)
+
+    def test_remove_batch(self):
+        self.lab2.staged = True
+        self.store.remove([self.lab.id, self.notes.id, 12345])
+
+        self.assertEqual(list(self.store), [self.lab2])
+        self.assertIsNone(self.store.get(self.lab.id))
+        self.assertEqual(self.store.in_courses(["SYSC2004", "ELEC2501"]), [self.lab2])
+        self.assertEqual(self.store.staged(), [self.lab2])
+
+    def test_ids_unique_across_stores(self):
+        other = PayloadStore().add("/dl/a.pdf", "/uni/a.pdf", "SYSC2004")
+        self.assertNotIn(other.id, {self.lab.id, self.notes.id, self.lab2.id})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from profiler import NullProfiler, Profiler
+from RuleManager import RuleManager
+from RuleParser import RuleParser
+
+
+class TestProfiler(unittest.TestCase):
+    def test_trace(self):
+        profiler = Profiler(slowest=2)
+        ruleManager: RuleManager = RuleParser("test_rules2.json").parse()
+        profiler.instrument_rules(ruleManager)
+
+        # The last file is a shape cache hit and evaluates no rules
+        with profiler.stage("classify", files=4):
+            for file in ["SYSC 2004 Lab 1.pdf", "MATH_1005 Test 2.pdf", "photo.png", "SYSC 2004 Lab 2.pdf"]:
+                ruleManager.match(file)
+        profiler.count("payloads", 2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "trace.json")
+            profiler.write(path)
+            trace = json.loads(path.read_text())
+
+        (stage,) = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+        self.assertEqual(stage["name"], "classify")
+        self.assertEqual(stage["args"]["files"], 4)
+        self.assertIn("cpu_ms", stage["args"])
+        self.assertEqual(trace["otherData"]["counts"], {"payloads": 2})
+        self.assertEqual(trace["otherData"]["rule_evaluations"], {"Programming": 1, "Math Files": 1})
+        self.assertEqual(trace["otherData"]["rule_matches"], {"Programming": 2, "Math Files": 1})
+        self.assertEqual(len(trace["otherData"]["slowest_files"]), 2)
+
+    def test_null_profiler_leaves_methods_alone(self):
+        ruleManager: RuleManager = RuleParser("test_rules2.json").parse()
+        NullProfiler().instrument_rules(ruleManager)
+        self.assertNotIn("match", vars(ruleManager))
+        self.assertIsNone(ruleManager.on_evaluate)
+
+
+if __name__ == "__main__":
+    unittest.main()
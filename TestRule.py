@@ -1,8 +1,10 @@
 import unittest
 
+from CompiledRule import CompiledRule
 from Rule import Rule
 from RuleManager import RuleManager
 from RuleParser import RuleParser
+from TagAutomaton import TagAutomaton
 
 
 class TestRule(unittest.TestCase):
@@ -257,5 +259,230 @@ class TestRulesJSON2(unittest.TestCase):
         self.assertEqual(ruleManager.get_path(file6), "./Math/REVIEW")
 
 
+class TestCompiledRule(unittest.TestCase):
+    def test_parse_compiles_rule_tree(self):
+        parser: RuleParser = RuleParser("test_rules2.json")
+        ruleManager: RuleManager = parser.parse()
+        self.assertEqual(len(ruleManager.compiled), 2)
+
+        programming: CompiledRule = ruleManager.compiled[0]
+        self.assertEqual(programming.name, "Programming")
+        self.assertEqual(len(programming.patterns), 3)
+        self.assertEqual(programming.path_parts, ("./Programming",))
+
+        assignment_number: CompiledRule = programming.children[0].children[0]
+        self.assertEqual(assignment_number.path_parts, ("./Programming/Assignment/Assignment ", "N", ""))
+        self.assertEqual(assignment_number.patterns[0][1], ("N",))
+
+    def test_fill_path_keeps_unknown_slots(self):
+        rule = Rule("rule", "Lab", "./Lab <N>", []).compile()
+        self.assertEqual(rule.fill_path({}), "./Lab <N>")
+        self.assertEqual(rule.fill_path({"N": "4"}), "./Lab 4")
+
+    def test_children_anchor_to_parent_tag(self):
+        programming: CompiledRule = RuleParser("test_rules2.json").parse().compiled[0]
+        assignments = programming.children[0]
+        self.assertEqual(assignments.anchored, (False,))  # "Assignment" may come before the course code
+        self.assertEqual(assignments.children[0].anchored, (True,))  # "$PARENT_TAG <N>"
+
+    def test_anchored_matches_equal_full_search(self):
+        import dataclasses
+
+        def unanchored(rule: CompiledRule) -> CompiledRule:
+            return dataclasses.replace(rule, anchored=(), children=tuple(unanchored(child) for child in rule.children))
+
+        ruleManager: RuleManager = RuleParser("test_rules2.json").parse()
+        plain = RuleManager.from_compiled([unanchored(rule) for rule in ruleManager.compiled])
+        files = [
+            "SYSC 2004 Lab 1.pdf",
+            "Assignment notes for SYSC 2004 Assignment 2.pdf",
+            "Lab 3 - SYSC_2004.pdf",
+            "SYSC2004 lab lab 4 Lab 5.pdf",
+            "sysc 2004 assignment.pdf",
+            "MATH_1005 Test 1.pdf",
+            "Holiday photo.png",
+        ]
+        for file in files:
+            self.assertEqual(ruleManager.match(file), plain.match(file), file)
+
+    def test_compiled_rule_is_immutable(self):
+        rule = Rule("rule", "Lab", "./Lab", []).compile()
+        with self.assertRaises(AttributeError):
+            rule.name = "other"  # type: ignore
+
+
+class TestPrefilter(unittest.TestCase):
+    def test_candidates(self):
+        parser: RuleParser = RuleParser("test_rules2.json")
+        ruleManager: RuleManager = parser.parse()
+
+        self.assertEqual(ruleManager.candidates("SYSC 2004 Lab 1.pdf"), [0])
+        self.assertEqual(ruleManager.candidates("sysc_2004 Lab 1.pdf"), [0])
+        self.assertEqual(ruleManager.candidates("SYSC   2004 Lab 1.pdf"), [0])
+        self.assertEqual(ruleManager.candidates("MATH_1005 Test 1.pdf"), [1])
+        self.assertEqual(ruleManager.candidates("SYSC2004 MATH_1005.pdf"), [1, 0])
+        self.assertEqual(ruleManager.candidates("Holiday photo.png"), [])
+
+    def test_rule_without_literal_is_always_candidate(self):
+        ruleManager: RuleManager = RuleManager()
+        ruleManager.add(Rule("labs", "Lab", "./Lab", []))
+        ruleManager.add(Rule("numbers", "<N>", "./<N>", []))
+
+        self.assertEqual(ruleManager.candidates("notes.txt"), [1])
+        self.assertEqual(ruleManager.get_path("Lab.txt"), "./Lab")
+        self.assertEqual(ruleManager.get_path("Lab 4.txt"), "./4")
+
+    def test_dotted_and_dotless_i(self):
+        ruleManager: RuleManager = RuleManager()
+        ruleManager.add(Rule("Final", "Final", "./Final", []))
+
+        for file in ["Fınal.pdf", "FİNAL.pdf"]:
+            self.assertIsNotNone(ruleManager.compiled[0].match(file))
+            self.assertEqual(ruleManager.match(file), ruleManager.compiled[0].match(file))
+
+    def test_automaton_reports_overlapping_literals(self):
+        automaton = TagAutomaton()
+        automaton.add("he", 0)
+        automaton.add("she", 1)
+        automaton.add("hers", 2)
+        automaton.add("his", 3)
+
+        self.assertEqual(automaton.search("ushers"), {0, 1, 2})
+        self.assertEqual(automaton.search("this"), {3})
+        self.assertEqual(automaton.search("xyz"), set())
+
+
+class TestMatchResult(unittest.TestCase):
+    def test_match_returns_rule_chain_and_captures(self):
+        parser: RuleParser = RuleParser("test_rules2.json")
+        ruleManager: RuleManager = parser.parse()
+
+        result = ruleManager.match("SYSC_2004 Lab 3 Grading Scheme.pdf")
+        self.assertIsNotNone(result)
+        self.assertEqual(result.rules, ("Programming", "Lab Files", "Lab Number"))
+        self.assertEqual(result.captures, (("N", "3"),))
+        self.assertEqual(result.capture("N"), "3")
+        self.assertEqual(result.path, "./Programming/Lab/Lab 3")
+
+        self.assertIsNone(ruleManager.match("Holiday photo.png"))
+
+    def test_match_does_not_mutate_rules(self):
+        parser: RuleParser = RuleParser("test_rules2.json")
+        ruleManager: RuleManager = parser.parse()
+        compiled = list(ruleManager.compiled)
+
+        ruleManager.match("SYSC 2004 Lab 3.pdf")
+
+        self.assertEqual(ruleManager.compiled, compiled)
+        self.assertEqual(ruleManager.get_path("SYSC 2004 Lab.pdf"), "./Programming/Lab")
+
+    def test_shared_manager_across_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        parser: RuleParser = RuleParser("test_rules2.json")
+        ruleManager: RuleManager = parser.parse()
+        files = [f"SYSC 2004 Lab {n}.pdf" for n in range(200)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            paths = list(pool.map(ruleManager.get_path, files))
+
+        self.assertEqual(paths, [f"./Programming/Lab/Lab {n}" for n in range(200)])
+
+
+class TestShapeCache(unittest.TestCase):
+    def setUp(self):
+        parser: RuleParser = RuleParser("test_rules2.json")
+        self.ruleManager: RuleManager = parser.parse()
+
+    def test_shape_keeps_digit_literals(self):
+        self.assertEqual(self.ruleManager.shape("SYSC 2004  Lab 3.pdf"), "sysc 2004 lab #.pdf")
+        self.assertEqual(self.ruleManager.shape("SYSC 2005 Lab 3.pdf"), "sysc # lab #.pdf")
+
+    def test_hit_re_extracts_captures(self):
+        self.assertEqual(self.ruleManager.get_path("SYSC 2004 Lab 3.pdf"), "./Programming/Lab/Lab 3")
+        self.assertEqual(self.ruleManager.get_path("sysc 2004 lab 14.pdf"), "./Programming/Lab/Lab 14")
+        self.assertIsNone(self.ruleManager.get_path("notes 1.txt"))
+        self.assertIsNone(self.ruleManager.get_path("notes 2.txt"))
+
+        self.assertEqual((self.ruleManager.hits, self.ruleManager.misses), (2, 2))
+        result = self.ruleManager.match("SYSC 2004 Lab 7.pdf")
+        self.assertEqual(result.rules, ("Programming", "Lab Files", "Lab Number"))
+        self.assertEqual(result.captures, (("N", "7"),))
+
+    def test_digit_literal_is_not_abstracted(self):
+        self.assertIsNotNone(self.ruleManager.get_path("SYSC 2004 Lab 3.pdf"))
+        self.assertIsNone(self.ruleManager.get_path("SYSC 2005 Lab 3.pdf"))
+        self.assertEqual(self.ruleManager.misses, 2)
+
+    def test_size_limit_evicts_least_recent(self):
+        self.ruleManager.cache_size = 2
+        self.ruleManager.get_path("a 1.txt")
+        self.ruleManager.get_path("b 1.txt")
+        self.ruleManager.get_path("a 2.txt")
+        self.ruleManager.get_path("c 1.txt")
+
+        self.assertEqual(list(self.ruleManager.shape_cache), ["a #.txt", "c #.txt"])
+
+    def test_add_invalidates(self):
+        self.assertIsNone(self.ruleManager.get_path("Holiday 3.png"))
+        self.ruleManager.add(Rule("Holiday", "Holiday <N>", "./Photos/<N>", []))
+
+        self.assertEqual(len(self.ruleManager.shape_cache), 0)
+        self.assertEqual(self.ruleManager.get_path("Holiday 4.png"), "./Photos/4")
+
+
+class TestClassifyMany(unittest.TestCase):
+    def setUp(self):
+        parser: RuleParser = RuleParser("test_rules2.json")
+        self.ruleManager: RuleManager = parser.parse()
+        self.files = [f"SYSC 2004 Lab {n}.pdf" if n % 3 else f"notes {n}.txt" for n in range(50)]
+        self.expected = [(file, self.ruleManager.get_path(file)) for file in self.files]
+
+    def test_classify_many_in_process(self):
+        results = list(self.ruleManager.classify_many(iter(self.files)))
+        self.assertEqual(results, self.expected)
+
+    def test_classify_many_process_pool(self):
+        results = list(self.ruleManager.classify_many(self.files, workers=2, chunksize=7, parallel_threshold=10))
+        self.assertEqual(results, self.expected)
+
+
+class TestRuleCache(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        from pathlib import Path
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.rules = self.root.joinpath("rules.json")
+        self.rules.write_text(Path("test_rules2.json").read_text())
+        self.cache = self.root.joinpath("rules.cache")
+        self.files = ["SYSC 2004 Lab 3.pdf", "SYSC_2004 Assignment 1.pdf", "notes.txt"]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cache_round_trip(self):
+        expected = [RuleParser(str(self.rules)).parse().get_path(file) for file in self.files]
+        first: RuleManager = RuleParser(str(self.rules)).load(self.cache)
+        self.assertTrue(self.cache.exists())
+        second: RuleManager = RuleParser(str(self.rules)).load(self.cache)
+
+        self.assertEqual(second.rules, [])  # came from the cache, not the JSON
+        self.assertEqual([first.get_path(file) for file in self.files], expected)
+        self.assertEqual([second.get_path(file) for file in self.files], expected)
+
+    def test_cache_invalidated_by_rules_change(self):
+        RuleParser(str(self.rules)).load(self.cache)
+        self.rules.write_text(self.rules.read_text().replace("./Programming", "./Java"))
+        ruleManager: RuleManager = RuleParser(str(self.rules)).load(self.cache)
+        self.assertEqual(ruleManager.get_path("SYSC 2004 Lab 3.pdf"), "./Java/Lab/Lab 3")
+
+    def test_corrupt_cache_is_rebuilt(self):
+        self.cache.write_bytes(b"not a pickle")
+        ruleManager: RuleManager = RuleParser(str(self.rules)).load(self.cache)
+        self.assertEqual(ruleManager.get_path("SYSC 2004 Lab 3.pdf"), "./Programming/Lab/Lab 3")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from file_walker import walk_files
+from ScanIndex import ScanIndex, config_hash
+
+
+class TestScanIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.db = self.root.joinpath("index.sqlite3")
+        self.src = self.root.joinpath("src")
+        self.src.mkdir()
+        self.src.joinpath("SYSC2004 Lab 1.pdf").write_text("lab")
+        self.src.joinpath("photo.png").write_text("photo")
+        self.calls: list[str] = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def classify(self, name: str) -> list[str]:
+        self.calls.append(name)
+        return ["SYSC2004"] if "SYSC2004" in name else []
+
+    def scan(self, config: str = "config") -> dict[str, list[str]]:
+        with ScanIndex(self.db, config) as index:
+            results = {entry.name: index.classify(entry, self.classify) for entry in walk_files(self.src)}
+            index.save()
+        return results
+
+    def test_warm_scan_skips_classification(self):
+        first = self.scan()
+        self.assertEqual(len(self.calls), 2)
+        self.calls.clear()
+
+        self.assertEqual(self.scan(), first)
+        self.assertEqual(self.calls, [])
+
+    def test_changed_file_is_reclassified(self):
+        self.scan()
+        self.calls.clear()
+
+        file = self.src.joinpath("photo.png")
+        file.write_text("a bigger photo")
+        os.utime(file, ns=(1, 1))
+
+        self.scan()
+        self.assertEqual(self.calls, ["photo.png"])
+
+    def test_config_change_invalidates(self):
+        self.scan("config")
+        self.calls.clear()
+
+        self.scan("other config")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_deleted_files_are_pruned(self):
+        self.scan()
+        self.src.joinpath("photo.png").unlink()
+        self.scan()
+
+        with ScanIndex(self.db, "config") as index:
+            self.assertEqual(len(index.entries), 1)
+
+    def test_shallow_walk_keeps_nested_entries(self):
+        nested = self.src.joinpath("nested")
+        nested.mkdir()
+        nested.joinpath("SYSC2004 Lab 2.pdf").write_text("lab")
+        self.scan()
+
+        self.src.joinpath("photo.png").unlink()
+        with ScanIndex(self.db, "config") as index:
+            for entry in walk_files(self.src, max_depth=0):
+                index.classify(entry, self.classify)
+            index.save(root=self.src, max_depth=0)
+
+        with ScanIndex(self.db, "config") as index:
+            self.assertEqual(sorted(os.path.basename(path) for path in index.entries),
+                             ["SYSC2004 Lab 1.pdf", "SYSC2004 Lab 2.pdf"])
+
+    def test_config_hash(self):
+        self.assertEqual(config_hash(["test_rules.json"]), config_hash(["test_rules.json"]))
+        self.assertNotEqual(config_hash(["test_rules.json"]), config_hash(["test_rules2.json"]))
+
+    def test_config_hash_includes_version(self):
+        import ScanIndex as module
+
+        before = config_hash(["test_rules.json"])
+        module.INDEX_VERSION += 1
+        try:
+            self.assertNotEqual(config_hash(["test_rules.json"]), before)
+        finally:
+            module.INDEX_VERSION -= 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import io
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import sorter
+
+
+class TestSorter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.src = self.root.joinpath("Downloads")
+        self.dst = self.root.joinpath("University")
+        self.src.mkdir()
+        self.dst.mkdir()
+        self.src.joinpath("SYSC 2004 Assignment 1.pdf").write_text("a")
+        self.src.joinpath("IMG_0001.jpg").write_text("b")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sort(self, *args: str) -> str:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            sorter.main(["--src", str(self.src), "--dst", str(self.dst), "--rules", "test_rules2.json",
+                         "--rules-cache", str(self.root.joinpath("rules.cache")),
+                         "--journal", str(self.root.joinpath("journal.ndjson")), *args])
+        return out.getvalue()
+
+    def test_dry_run_moves_nothing(self):
+        output = self.sort("--dry-run", "--create-folders")
+        self.assertIn("[move, new folder]", output)
+        self.assertNotIn("IMG_0001", output)
+        self.assertTrue(self.src.joinpath("SYSC 2004 Assignment 1.pdf").exists())
+        self.assertEqual(list(self.dst.iterdir()), [])
+
+    def test_apply(self):
+        self.assertIn("1 moved", self.sort("--apply", "--create-folders"))
+        self.assertTrue(self.dst.joinpath("Programming/Assignment/Assignment 1/SYSC 2004 Assignment 1.pdf").exists())
+        self.assertTrue(self.src.joinpath("IMG_0001.jpg").exists())
+
+    def test_apply_without_create_folders(self):
+        self.assertIn("1 missing-folder", self.sort("--apply"))
+        self.assertTrue(self.src.joinpath("SYSC 2004 Assignment 1.pdf").exists())
+
+    def test_stream_apply(self):
+        self.assertIn("1 moved", self.sort("--apply", "--create-folders", "--stream"))
+        self.assertTrue(self.dst.joinpath("Programming/Assignment/Assignment 1/SYSC 2004 Assignment 1.pdf").exists())
+
+    def test_pipeline_backpressure(self):
+        from pipeline import Pipeline
+        from RuleParser import RuleParser
+
+        for n in range(40):
+            self.src.joinpath(f"SYSC 2004 Lab {n % 3} ({n}).pdf").write_text(str(n))
+        self.src.joinpath("SYSC 2004 Lab 0 (0).pdf").unlink()
+        self.dst.joinpath("Programming/Lab/Lab 0").mkdir(parents=True)
+        self.dst.joinpath("Programming/Lab/Lab 0/SYSC 2004 Lab 0 (0).pdf").write_text("already here")
+        self.src.joinpath("SYSC 2004 Lab 0 (0).pdf").write_text("new")
+
+        pipeline = Pipeline(self.src, self.dst, RuleParser("test_rules2.json").parse(), create_folders=True,
+                            journal_path=str(self.root.joinpath("journal.ndjson")), batch_size=3, queue_batches=1)
+        with redirect_stdout(io.StringIO()):
+            summary = pipeline.run()
+
+        self.assertEqual(summary, {"moved": 40, "skipped-exists": 1})
+        self.assertEqual(sorted(path.name for path in self.src.iterdir()), ["IMG_0001.jpg", "SYSC 2004 Lab 0 (0).pdf"])
+
+    def test_sort_does_not_import_ui(self):
+        code = ("import sys, main; main.main(sys.argv[1:]); "
+                "print(sorted(m for m in ('InquirerPy', 'prompt_toolkit', 'colorama', 'customtkinter') if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code, "sort", "--src", str(self.src), "--rules", "test_rules2.json",
+                                 "--rules-cache", str(self.root.joinpath("rules.cache"))],
+                                capture_output=True, text=True, check=True)
+        self.assertTrue(result.stdout.rstrip().endswith("[]"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from mover import MoveStatus, move_file
+from RuleParser import RuleParser
+from watcher import Watcher, is_partial_download
+
+
+class TestMoveFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.src = self.root.joinpath("a.pdf")
+        self.src.write_text("a")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_move(self):
+        dst = self.root.joinpath("b.pdf")
+        self.assertEqual(move_file(self.src, dst), MoveStatus.MOVED)
+        self.assertTrue(dst.exists())
+
+    def test_existing_destination(self):
+        dst = self.root.joinpath("b.pdf")
+        dst.write_text("b")
+        self.assertEqual(move_file(self.src, dst), MoveStatus.SKIPPED_EXISTS)
+        self.assertEqual(dst.read_text(), "b")
+
+    def test_missing_source(self):
+        self.assertEqual(move_file(self.root.joinpath("x.pdf"), self.root.joinpath("y.pdf")), MoveStatus.MISSING_SRC)
+
+    def test_missing_folder(self):
+        dst = self.root.joinpath("new", "a.pdf")
+        self.assertEqual(move_file(self.src, dst), MoveStatus.MISSING_FOLDER)
+        self.assertEqual(move_file(self.src, dst, lambda folder: True), MoveStatus.MOVED)
+        self.assertTrue(dst.exists())
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = Path(self.tmp.name, "Downloads")
+        self.dst = Path(self.tmp.name, "University")
+        self.src.mkdir()
+        self.dst.mkdir()
+        self.results = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_watcher(self, watcher: Watcher, seconds: float):
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            timeout = watcher.next_timeout()
+            for path in watcher.backend.wait(0.05 if timeout is None else min(timeout, 0.05)):
+                watcher.notify(path)
+            watcher.process_due()
+
+    def check_sorts_new_files(self, poll: bool):
+        rule_manager = RuleParser("test_rules2.json").parse()
+        watcher = Watcher(self.src, self.dst, rule_manager, create_folders=True, settle=0.05, poll=poll,
+                          on_result=lambda src, dst, status: self.results.append((src.name, status)))
+        watcher.backend.interval = 0.02  # type: ignore
+
+        self.src.joinpath("SYSC 2004 Lab 2.pdf.part").write_text("partial")
+        self.src.joinpath("SYSC 2004 Lab 2.pdf").write_text("lab")
+        self.src.joinpath("photo.png").write_text("photo")
+        self.run_watcher(watcher, 0.5)
+        watcher.backend.close()
+
+        self.assertTrue(self.dst.joinpath("Programming", "Lab", "Lab 2", "SYSC 2004 Lab 2.pdf").exists())
+        self.assertTrue(self.src.joinpath("SYSC 2004 Lab 2.pdf.part").exists())
+        self.assertIn(("SYSC 2004 Lab 2.pdf", MoveStatus.MOVED), self.results)
+        self.assertIn(("photo.png", None), self.results)
+
+    def test_sorts_new_files(self):
+        self.check_sorts_new_files(poll=False)
+
+    def test_sorts_new_files_polling(self):
+        self.check_sorts_new_files(poll=True)
+
+    def test_is_partial_download(self):
+        self.assertTrue(is_partial_download("slides.pdf.crdownload"))
+        self.assertTrue(is_partial_download("slides.pdf.PART"))
+        self.assertFalse(is_partial_download("slides.pdf"))
+
+
+if __name__ == "__main__":
+    unittest.main()
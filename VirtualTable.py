@@ -0,0 +1,145 @@
+from typing import Any, Callable, Sequence
+
+import customtkinter as ctk
+
+ROW_HEIGHT = 32
+
+
+class TableRow:
+    """
+    The widgets of one visible row. Rows are reused: render() rebinds them to whichever
+    item is currently scrolled into their slot.
+    """
+
+    def __init__(self, table: "VirtualTable", slot: int) -> None:
+        self.index: int | None = None
+        self.checkbox = ctk.CTkCheckBox(table.body, text="", width=24, command=lambda: table.toggle(self.index))
+        self.src_label = ctk.CTkLabel(table.body, text="", anchor="w")
+        self.dst_label = ctk.CTkLabel(table.body, text="", anchor="w")
+
+        self.checkbox.grid(row=slot, column=0, padx=5, pady=2)
+        self.src_label.grid(row=slot, column=1, sticky="nsew", padx=5, pady=2)
+        self.dst_label.grid(row=slot, column=2, sticky="nsew", padx=5, pady=2)
+
+    def widgets(self) -> tuple[ctk.CTkBaseClass, ...]:
+        return (self.checkbox, self.src_label, self.dst_label)
+
+    def bind(self, index: int, item: Any, texts: tuple[str, str]):
+        self.index = index
+        self.src_label.configure(text=texts[0])
+        self.dst_label.configure(text=texts[1])
+        if item.staged:
+            self.checkbox.select()
+        else:
+            self.checkbox.deselect()
+        for widget in self.widgets():
+            widget.grid()
+
+    def clear(self):
+        self.index = None
+        for widget in self.widgets():
+            widget.grid_remove()
+
+    def destroy(self):
+        for widget in self.widgets():
+            widget.destroy()
+
+
+class VirtualTable(ctk.CTkFrame):
+    """
+    Scrollable checkbox table that only creates enough rows to fill the viewport.
+    The items (anything with a boolean `staged` attribute) are the model: checking a row
+    sets item.staged, and scrolling rebinds the same row widgets to other items, so the
+    widget count stays constant however many items there are.
+    """
+
+    def __init__(self, master: Any, row_text: Callable[[Any], tuple[str, str]],
+                 on_toggle: Callable[[Any], None] | None = None, **kwargs) -> None:
+        super().__init__(master, **kwargs)
+        self.row_text = row_text
+        self.on_toggle = on_toggle
+        self.items: Sequence[Any] = []
+        self.first = 0
+        self.rows: list[TableRow] = []
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid_columnconfigure(0, weight=0)   # checkbox col
+        self.body.grid_columnconfigure(1, weight=1, uniform="path")  # source col
+        self.body.grid_columnconfigure(2, weight=1, uniform="path")  # dest col
+        self.body.pack(side="left", fill="both", expand=True)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body.bind("<Configure>", self.on_resize)
+        self.bind_wheel(self.body)
+
+    def bind_wheel(self, widget: Any):
+        widget.bind("<MouseWheel>", self.on_wheel)   # Windows / macOS
+        widget.bind("<Button-4>", self.on_wheel)     # X11 up
+        widget.bind("<Button-5>", self.on_wheel)     # X11 down
+
+    def set_items(self, items: Sequence[Any]):
+        self.items = items
+        self.first = min(self.first, self.max_first())
+        self.render()
+
+    def visible_rows(self) -> int:
+        return max(1, self.body.winfo_height() // ROW_HEIGHT)
+
+    def max_first(self) -> int:
+        return max(0, len(self.items) - self.visible_rows())
+
+    def on_resize(self, event: Any = None):
+        needed = self.visible_rows()
+        while len(self.rows) < needed:
+            row = TableRow(self, len(self.rows))
+            for widget in row.widgets():
+                self.bind_wheel(widget)
+            self.rows.append(row)
+        while len(self.rows) > needed:
+            self.rows.pop().destroy()
+        self.first = min(self.first, self.max_first())
+        self.render()
+
+    def scroll_to(self, first: int):
+        first = max(0, min(first, self.max_first()))
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    def on_scrollbar(self, action: str, amount: str, unit: str | None = None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.items)))
+        elif action == "scroll":
+            step = self.visible_rows() if unit == "pages" else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def on_wheel(self, event: Any):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.first - 3)
+        elif event.num == 5 or event.delta < 0:
+            self.scroll_to(self.first + 3)
+
+    def toggle(self, index: int | None):
+        if index is None or index >= len(self.items):
+            return
+        item = self.items[index]
+        item.staged = not item.staged
+        if self.on_toggle is not None:
+            self.on_toggle(item)
+
+    def render(self):
+        for slot, row in enumerate(self.rows):
+            index = self.first + slot
+            if index < len(self.items):
+                item = self.items[index]
+                row.bind(index, item, self.row_text(item))
+            else:
+                row.clear()
+
+        if self.items:
+            self.scrollbar.set(self.first / len(self.items),
+                               min(1.0, (self.first + len(self.rows)) / len(self.items)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
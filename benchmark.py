@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from course_rules import build_course_rules
+from file_walker import walk_files
+from MovePlanner import MovePlanner
+from RuleParser import RuleParser
+from ScanIndex import ScanIndex
+from scanner import scan_rules
+
+COURSE_JSON = "./courses.json"
+RESULTS_JSON = "./benchmark_results.json"
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+SEED = 2004
+
+COURSE_FILE_RATIO = 0.4
+SUBFOLDER_RATIO = 0.1
+
+COURSE_TEMPLATES = [
+    "{code} {folder} {n}.pdf",
+    "{code} {folder} {n} ({k}).pdf",
+    "{code} {folder} {n} Grading Scheme.pdf",
+    "{code}_{folder_lower}_{n}_solutions.pdf",
+    "{folder} {n} - {code}.docx",
+    "{code} {folder} Notes.pptx",
+    "{code} Course Outline.pdf",
+]
+NOISE_TEMPLATES = [
+    "IMG_{n:04}.jpg",
+    "Screenshot 2024-{m:02}-{d:02} {n:06}.png",
+    "setup-x64-{n}.exe",
+    "Invoice_{n}.pdf",
+    "resume_v{k}.docx",
+    "{word}-{word2}-{n}.zip",
+    "{word} ({k}).pdf",
+]
+WORDS = ["report", "photo", "export", "backup", "archive", "draft", "budget", "tickets", "notes", "download"]
+
+
+def code_variants(course_code: str) -> list[str]:
+    subject, number = course_code[:4], course_code[4:]
+    return [f"{subject} {number}", f"{subject}{number}", f"{subject}_{number}", f"{subject.lower()}{number}"]
+
+
+def load_fixture_courses(courses_json: dict) -> list[tuple[str, str, str, dict[str, Any]]]:
+    """
+    Flattens courses.json into (year, semester, course_code, course_json) tuples.
+    """
+    return [(year, semester, course_code, course_json)
+            for year, semesters in courses_json.items()
+            for semester, courses in semesters.items()
+            for course_code, course_json in courses.items()]
+
+
+def generate_rules(courses: list[tuple[str, str, str, dict[str, Any]]]) -> dict:
+    """
+    Builds a rules.json-style document with one rule tree per course: course → folder → number.
+    """
+    rules = {}
+    for year, semester, course_code, course_json in courses:
+        variants = code_variants(course_code)
+        folders = {}
+        for folder in course_json["folders"]:
+            folders[folder.capitalize()] = {
+                "tag": folder.capitalize(),
+                "path": "$PARENT_PATH/$TAG",
+                "$RULES": {
+                    f"{folder.capitalize()} Number": {"tag": "$PARENT_TAG <N>", "path": "$PARENT_PATH/$PARENT_TAG <N>"},
+                },
+            }
+        rules[course_code] = {
+            "tag": variants[0],
+            "aliases": variants[1:3],
+            "path": f"./{year}/{semester}/{course_json['name']}",
+            "$RULES": folders,
+        }
+    return {"$RULES": rules}
+
+
+def generate_names(courses: list[tuple[str, str, str, dict[str, Any]]], count: int, rng: random.Random) -> list[str]:
+    names: list[str] = []
+    seen: set[str] = set()
+    for i in range(count):
+        if rng.random() < COURSE_FILE_RATIO:
+            _, _, course_code, course_json = rng.choice(courses)
+            folder = rng.choice(course_json["folders"]).capitalize()
+            name = rng.choice(COURSE_TEMPLATES).format(
+                code=rng.choice(code_variants(course_code)), folder=folder, folder_lower=folder.lower(),
+                n=rng.randint(1, 12), k=rng.randint(1, 3))
+        else:
+            name = rng.choice(NOISE_TEMPLATES).format(
+                n=rng.randint(0, 999_999), k=rng.randint(1, 9), m=rng.randint(1, 12), d=rng.randint(1, 28),
+                word=rng.choice(WORDS), word2=rng.choice(WORDS))
+
+        if name in seen:
+            stem, ext = os.path.splitext(name)
+            name = f"{stem} [{i}]{ext}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def generate_tree(root: Path, courses: list[tuple[str, str, str, dict[str, Any]]], count: int,
+                  rng: random.Random) -> tuple[Path, Path, Path]:
+    """
+    Creates a synthetic Downloads tree of empty files, a University tree holding half of the
+    course folders, and a matching rules file. Returns (src, dst, rules_path).
+    """
+    src = root.joinpath("Downloads")
+    dst = root.joinpath("University")
+    src.mkdir()
+    dst.mkdir()
+
+    for name in generate_names(courses, count, rng):
+        folder = src
+        if rng.random() < SUBFOLDER_RATIO:
+            folder = src.joinpath(f"Folder {rng.randint(1, 20)}", *(["nested"] if rng.random() < 0.3 else []))
+            folder.mkdir(parents=True, exist_ok=True)
+        os.close(os.open(folder.joinpath(name), os.O_CREAT | os.O_WRONLY))
+
+    for year, semester, _, course_json in courses[::2]:
+        for folder in course_json["folders"]:
+            dst.joinpath(year, semester, course_json["name"], folder.capitalize()).mkdir(parents=True, exist_ok=True)
+
+    rules_path = root.joinpath("rules.json")
+    rules_path.write_text(json.dumps(generate_rules(courses)))
+    return src, dst, rules_path
+
+
+def timed(results: dict[str, Any], stage: str, fn: Callable[[], Any]) -> Any:
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    value = fn()
+    results[stage] = {
+        "wall_s": round(time.perf_counter() - start_wall, 6),
+        "cpu_s": round(time.process_time() - start_cpu, 6),
+    }
+    return value
+
+
+def run_size(courses_json: dict, count: int, workers: int | None) -> dict[str, Any]:
+    courses = load_fixture_courses(courses_json)
+    rng = random.Random(SEED + count)
+    results: dict[str, Any] = {"files": count}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        src, dst, rules_path = timed(results, "generate", lambda: generate_tree(root, courses, count, rng))
+
+        rule_manager = timed(results, "parse_rules", lambda: RuleParser(str(rules_path)).parse())
+        entries = timed(results, "scan", lambda: list(walk_files(src)))
+        names = [entry.name for entry in entries]
+
+        paths = timed(results, "classify", lambda: [rule_manager.get_path(name) for name in names])
+        timed(results, "classify_many", lambda: list(rule_manager.classify_many(names, workers=workers)))
+        results["matched"] = sum(path is not None for path in paths)
+
+        course_rules = timed(results, "build_course_rules", lambda: build_course_rules(courses_json))
+
+        def traverse() -> int:
+            with ScanIndex(root.joinpath("scan_index.sqlite3"), "benchmark") as scan_index:
+                found = sum(1 for _ in scan_rules(src, course_rules, scan_index))
+                scan_index.save()
+            return found
+
+        results["traverse_matched"] = timed(results, "traverse_cold", traverse)
+        timed(results, "traverse_warm", traverse)
+
+        moves = [(Path(entry.path), dst.joinpath(path, entry.name))
+                 for entry, path in zip(entries, paths) if path is not None]
+        timed(results, "dry_run_plan", lambda: MovePlanner().plan(moves))
+
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing, scanning, classification and planning on synthetic trees")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="numbers of files to generate (e.g. 1000 10000 100000 1000000)")
+    parser.add_argument("--courses", default=COURSE_JSON, help="courses.json used as the fixture")
+    parser.add_argument("--workers", type=int, default=None, help="workers for classify_many")
+    parser.add_argument("--output", default=RESULTS_JSON, help="where to write the JSON results")
+    args = parser.parse_args()
+
+    with open(args.courses, "r") as f:
+        courses_json = json.load(f)
+
+    report = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": [],
+    }
+
+    for size in args.sizes:
+        result = run_size(courses_json, size, args.workers)
+        report["results"].append(result)
+        stages = ", ".join(f"{stage} {value['wall_s']:.3f}s" for stage, value in result.items() if isinstance(value, dict))
+        print(f"{size:>9} files: {stages}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
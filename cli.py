@@ -1,5 +1,5 @@
-from typing import Any
-from terminal_utils import pretty_substring, user_choice_bool
+import argparse
+import os
 from math import e
 from enum import IntEnum, StrEnum, auto
 from InquirerPy import inquirer
@@ -12,114 +12,44 @@ import json
 from pathlib import Path
 from colorama import Fore
 from Course import Course
+from CourseIndex import CourseIndex
+from course_rules import build_course_rules
+from RuleManager import RuleManager
+from scanner import scan_rules
+from mover import MoveStatus
+from MoveExecutor import MoveExecutor
+from journal import JOURNAL_PATH, MoveJournal
+from MovePlanner import Collision, MovePlanner
+from duplicates import DuplicateAction, DuplicateFinder, HashCache
+from ScanIndex import ScanIndex, config_hash
+from PayloadStore import Payload, PayloadStore
+from profiler import NullProfiler, Profiler
 
 BASE_DST_PATH = Path("C:/Users/morri/Onedrive/University")
 BASE_SRC_PATH = Path("C:/Users/morri/Downloads")
 COURSE_JSON = "./courses.json"
+YEAR_TO_FOLDER_JSON = "./year_to_folder.json"
+SCAN_INDEX_DB = "./scan_index.sqlite3"
+COLLISION = Collision.SKIP  # or Collision.SUFFIX to keep both files as "name (1).ext"
+DUPLICATE_ACTION = DuplicateAction.SKIP  # or DuplicateAction.REMOVE to delete sources already at their destination
 
 cursor_pos = 0
 
 
-class Folder(StrEnum):
-    LAB = "Lab"
-    ASSIGNMENT = "Assignment"
-    REVIEW = "Review"
-    LECTURE = "Lecture"
-    TUTORIAL = "Tutorial"
-    INFO = "Info"
-    OTHER = "Other"
-
-
-class Payload():
-    def __init__(self, src: Path, dst: Path, course_code: str, course: Course):
-        self.type = None
-        self.src = src
-        self.dst = self.generate_dst_path(dst)
-        self.sent = False
-        self.course_code = course_code
-        self.course = course
-
-    def __eq__(self, o: object) -> bool:
-        if type(o) != Payload:
-            return False
-
-        return self.type == o.type and self.src == o.src and self.dst == o.dst and self.sent == o.sent and self.course_code == o.course_code
-
-    def generate_dst_path(self, dst: Path) -> Path:
-        for folder in Folder:
-            if folder in self.src.name:
-                self.type = folder.value
-                return dst.joinpath(folder, self.src.name)
-        return Path("error")
-
-    def __repr__(self):
-        return f"{self.src.name:<40} {Fore.YELLOW}{self.dst.parent.name:<40}{Fore.RESET}"
-
-    __str__ = __repr__
-
-    def name(self):
-        return f"{self.src.name} [{self.dst.parent.name}]"
-
-    def send(self, send_enabled=False, debug_mode=False) -> bool:
-        """
-        Sends a file from src to dst. Prints out certain results.
-        Returns True on success, False otherwise.
-        """
-
-        def log(from_path, to_path, status_msg="", color=Fore.RESET):
-            print(f"{color}From: {from_path}\n  To: {to_path} \n{status_msg}{Fore.RESET}\n")
-
-        if not send_enabled:
-            if debug_mode:
-                log(self.src, self.dst, "Sending Not Enabled", Fore.YELLOW)
-            return False
-
-        try:
-            if not self.src.exists():
-                if debug_mode:
-                    log(self.src, self.dst, "Src File Does Not Exist", Fore.YELLOW)
-                return False
-
-            if self.dst.exists():
-                if debug_mode:
-                    log(self.src, self.dst, "Dst File Already Exists", Fore.YELLOW)
-                return False
-
-            if not self.dst.parent.exists():
-                if debug_mode:
-                    log(self.src, pretty_substring(str(self.dst), self.dst.parent.name),
-                        f"'{self.dst.parent.name}' Does Not Exist", Fore.YELLOW)
-                if self.prompt_to_create_folder(self.dst.parent.name):
-                    self.dst.parent.mkdir(parents=True, exist_ok=True)
-                else:
-                    return False
+def payload_line(payload: Payload) -> str:
+    return f"{payload.name:<40} {Fore.YELLOW}{os.path.basename(payload.dst_dir):<40}{Fore.RESET}"
 
-            self.src.rename(self.dst)
-            if debug_mode:
-                log(self.src, self.dst, "SUCCESS", Fore.GREEN)
-            return True
 
-        except FileNotFoundError as e:
-            if debug_mode:
-                log(self.src, self.dst, f"File Not Found: {e}", Fore.RED)
-            return False
+def payload_label(payload: Payload) -> str:
+    return f"{payload.name} [{os.path.basename(payload.dst_dir)}]"
 
-        except Exception as error:
-            if debug_mode:
-                print(Fore.RED + f"Unexpected Error: {error}" + Fore.RESET)
-            return False
 
-    def prompt_to_create_folder(self, folder_name: str):
-        return inquirer.confirm(  # type: ignore
-            message=f"Create {folder_name}? (y/n): ",
-            default=False
-        ).execute()
+def payload_success(payload: Payload) -> str:
+    return f"{Fore.GREEN}☑ {payload_label(payload)}{Fore.RESET}"
 
-    def success(self):
-        return f"{Fore.GREEN}☑ {self.name()}{Fore.RESET}"
 
-    def error(self, msg="N/A"):
-        return f"{Fore.RED}☒ {self.name()} ({msg}){Fore.RESET}"
+def payload_error(payload: Payload, msg="N/A") -> str:
+    return f"{Fore.RED}☒ {payload_label(payload)} ({msg}){Fore.RESET}"
 
 
 class Selection(StrEnum):
@@ -127,25 +57,28 @@ class Selection(StrEnum):
 
 
 class CLIApp():
-    def __init__(self):
-        self.built_courses_dict: dict[str, Course] = {}
+    def __init__(self, profiler: Profiler | NullProfiler | None = None):
+        self.profiler = profiler or NullProfiler()
+        self.course_index: CourseIndex = CourseIndex()
         self.courses_by_year: dict[str, list[Course]] = {}
-        self.payloads_to_send: list[Payload] = []
+        self.store = PayloadStore()
         self.years: list[str] = []
         self.year_to_folder: dict[str, str] = self.load_year_to_folder()
         self.selected_years: list[int] = []
-        self.selected_courses: list[Any] = []
+        self.selected_courses: list[str] = []
         self.selected_payloads: list[Payload] = []
 
     def start(self):
-        self.load_data()
-        self.filter_years()
-        self.filter_courses()
-        self.filter_payloads()
+        with self.profiler.stage("load_data"):
+            self.load_data()
+        with self.profiler.stage("prompts"):
+            self.filter_years()
+            self.filter_courses()
+            self.filter_payloads()
         self.prompt_to_send_payloads()
 
     def load_year_to_folder(self):
-        with open("year_to_folder.json", "r") as f:
+        with open(YEAR_TO_FOLDER_JSON, "r") as f:
             data = json.load(f)
 
         return data
@@ -153,23 +86,21 @@ class CLIApp():
     def get_choice_start(self):
         return Choice(Selection.ALL, "All",  enabled=False)  # type: ignore
 
-    def traverse_folder(self, src_folder_path: Path, built_course_dict: dict) -> list[Payload]:
-        files_to_be_sent: list[Payload] = []
-
-        for file in src_folder_path.iterdir():
+    def traverse_folder(self, src_folder_path: Path, rule_manager: RuleManager, scan_index: ScanIndex) -> PayloadStore:
+        store = PayloadStore()
 
-            for course_code in built_course_dict:
-                if course_code not in file.name:
-                    continue
-
-                course: Course = built_course_dict[course_code]
-                payload = Payload(file, course.dst_path, course_code, course)
-                files_to_be_sent.append(payload)
+        for entry, result in scan_rules(src_folder_path, rule_manager, scan_index, max_depth=0):
+            course = self.course_index.get(result.rules[0])
+            if course is None:  # year folder isn't in the University folder
+                continue
+            folder = result.rules[1] if len(result.rules) > 1 else None
+            year = course.dst_path.parent.parent.name
+            store.add(entry.path, BASE_DST_PATH.joinpath(result.path, entry.name), course.course_code, year, folder)
 
-        return files_to_be_sent
+        return store
 
     def load_data(self):
-        with open(COURSE_JSON, "r") as f:
+        with self.profiler.stage("load_courses"), open(COURSE_JSON, "r") as f:
             courses_json = json.load(f)
             for folder in BASE_DST_PATH.iterdir():
                 self.years.append(folder.name)
@@ -179,14 +110,18 @@ class CLIApp():
                             for course_code, course_json in courses_json[folder.name][semester].items():
                                 parent_path = folder.absolute().joinpath(semester)
                                 c = Course(course_code, course_json, parent_path)
-                                self.built_courses_dict[course_code] = c
-
-                                alt_course_code = course_code[0:4] + " " + course_code[4:]
-                                self.built_courses_dict[alt_course_code] = c
-
+                                self.course_index.add(c)
                                 self.courses_by_year.setdefault(folder.name, []).append(c)
 
-        self.payloads_to_send = self.traverse_folder(BASE_SRC_PATH, self.built_courses_dict)
+            rule_manager = build_course_rules(courses_json, self.year_to_folder.values())
+
+        self.profiler.instrument_rules(rule_manager)
+        with self.profiler.stage("scan"):
+            with ScanIndex(SCAN_INDEX_DB, config_hash([COURSE_JSON, YEAR_TO_FOLDER_JSON])) as scan_index:
+                self.store = self.traverse_folder(BASE_SRC_PATH, rule_manager, scan_index)
+                # Only the top of the folder was walked; keep the GUI's entries for subfolders
+                scan_index.save(root=BASE_SRC_PATH, max_depth=0)
+        self.profiler.count("payloads", len(self.store))
 
     def build_output_files_string(self) -> str:
         last_course_code = None
@@ -196,7 +131,7 @@ class CLIApp():
                 last_course_code = payload.course_code
                 s += f"\n{Fore.BLUE}{last_course_code}{Fore.RESET}"
 
-            s += f"\n  {Fore.BLUE}❯{Fore.RESET} {payload}"
+            s += f"\n  {Fore.BLUE}❯{Fore.RESET} {payload_line(payload)}"
 
         return s + '\n'
 
@@ -224,7 +159,7 @@ class CLIApp():
         choices = [Choice(course, self.seperate_course_code(course.course_code)) for course in self.filtered_courses]
 
         list_of_courses: list[Course] = self.select_input("Filter by Course", choices)
-        self.selected_courses = [self.seperate_course_code(c.course_code) for c in list_of_courses]
+        self.selected_courses = [c.course_code for c in list_of_courses]
 
     def filter_payloads(self):
         if not self.selected_courses:
@@ -233,8 +168,8 @@ class CLIApp():
 
         print(f"{Fore.CYAN}Root: {BASE_SRC_PATH}{Fore.RESET}")
 
-        choices = [Choice(payload, payload.src.name) for payload in self.payloads_to_send
-                   if self.seperate_course_code(payload.course_code) in self.selected_courses]
+        # Read straight from the store's per-course groups instead of checking every payload
+        choices = [Choice(payload, payload.name) for payload in self.store.in_courses(self.selected_courses)]
 
         if not len(choices):
             print("No files match selected courses")
@@ -281,23 +216,56 @@ class CLIApp():
         else:
             print("Exiting Program...")
 
+    def prompt_to_create_folders(self, folders: list[Path]) -> bool:
+        print(f"{Fore.YELLOW}Missing folders:{Fore.RESET}")
+        for folder in folders:
+            print(f"  {Fore.YELLOW}❯{Fore.RESET} {folder}")
+
+        return inquirer.confirm(  # type: ignore
+            message=f"Create {len(folders)} folder(s)? (y/n): ",
+            default=False
+        ).execute()
+
     def send_payloads(self):
-        to_delete: list = []
-        for payload in self.selected_payloads:
-            try:
-                if payload.send(send_enabled=True):  # send file
-                    to_delete.append(payload)
-                    print(payload.success())
+        moves = [(payload.src, payload.dst) for payload in self.selected_payloads]
+        with self.profiler.stage("plan", files=len(moves)), HashCache(SCAN_INDEX_DB) as hash_cache:
+            plan = MovePlanner(COLLISION, DuplicateFinder(hash_cache)).plan(moves, self.prompt_to_create_folders)
+            hash_cache.save()
+
+        ready: list[Payload] = []
+        for payload, planned in zip(self.selected_payloads, plan):
+            if planned.ready:
+                payload.dst = planned.dst
+                ready.append(payload)
+            elif planned.status == MoveStatus.DUPLICATE and DUPLICATE_ACTION == DuplicateAction.REMOVE:
+                payload.src.unlink(missing_ok=True)
+                print(payload_success(payload) + f" {Fore.YELLOW}(removed duplicate){Fore.RESET}")
+            else:
+                print(payload_error(payload, planned.status))
+
+        with self.profiler.stage("send", files=len(ready)):
+            results = MoveJournal(JOURNAL_PATH).execute(MoveExecutor(), [(payload.src, payload.dst) for payload in ready])
+
+            for payload, result in zip(ready, results):
+                if result.status == MoveStatus.MOVED:
+                    payload.sent = True
+                    print(payload_success(payload))
                 else:
-                    print(payload.error())
-            except Exception as e:
-                print(f"ERROR: {e}")
-                continue
+                    print(payload_error(payload, result.error or result.status))
+        self.profiler.count("sent", sum(payload.sent for payload in ready))
 
 
-def main():
-    app = CLIApp()
-    app.start()
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Sort course files from Downloads into the University folder")
+    parser.add_argument("--profile", metavar="TRACE_JSON", help="write a Chrome trace of the run to this file")
+    args = parser.parse_args(argv)
+
+    profiler = Profiler() if args.profile else NullProfiler()
+    app = CLIApp(profiler)
+    try:
+        app.start()
+    finally:
+        profiler.write(args.profile)
 
 
 if __name__ == "__main__":
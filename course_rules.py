@@ -0,0 +1,72 @@
+import json
+import os
+from typing import Any, Iterable
+
+from CourseIndex import normalize_course_code
+from Keywords import PARENT_PATH, SELF_TAG
+from Rule import Rule
+from RuleManager import RuleManager
+from RuleParser import RULES_CACHE, cache_key, load_cached
+
+COURSES_JSON = "./courses.json"
+YEAR_TO_FOLDER_JSON = "./year_to_folder.json"
+
+
+def course_code_spellings(course_code: str) -> list[str]:
+    """
+    'SYSC2004' → ['SYSC 2004', 'SYSC2004', 'SYSC_2004', 'SYSC-2004'], the spellings a
+    tag regex has to list separately ('SYSC 2004' already covers runs of whitespace).
+    """
+    code = normalize_course_code(course_code)
+    subject, number = code[:4], code[4:]
+    return [f"{subject} {number}", code, f"{subject}_{number}", f"{subject}-{number}"]
+
+
+def course_rule(course_code: str, course_json: dict[str, Any], year: str, semester: str) -> Rule:
+    """
+    Builds the rule tree for one course: the course code routes a file to the course
+    folder, and a folder name from the course's "folders" list routes it one level down.
+    Folder names only match at the start of a word, so 'PASS' doesn't send 'compass.pdf'
+    to the PASS folder, while 'Labs' and 'LectureNotes' still go to Lab and Lecture.
+    """
+    tag, *aliases = course_code_spellings(course_code)
+    rule = Rule(course_code, tag, f"./{year}/{semester}/{course_json['name']}", aliases)
+    for folder in course_json["folders"]:
+        child = Rule(folder.capitalize(), folder.capitalize(), f"{PARENT_PATH}/{SELF_TAG}", [], parent=rule)
+        child.word_start = True
+        rule.add_child(child)
+    return rule
+
+
+def build_course_rules(courses_json: dict[str, Any], year_folders: Iterable[str] | None = None) -> RuleManager:
+    """
+    Compiles courses.json into one rule tree per course, so a filename is classified to its
+    full destination (relative to the University folder) in a single RuleManager pass.
+    year_folders limits the rules to those years (e.g. the values of year_to_folder.json).
+    """
+    years = set(courses_json) if year_folders is None else set(year_folders)
+    rule_manager = RuleManager()
+    for year, semesters in courses_json.items():
+        if year not in years:
+            continue
+        for semester, courses in semesters.items():
+            for course_code, course_json in courses.items():
+                rule_manager.add(course_rule(course_code, course_json, year, semester))
+    return rule_manager
+
+
+def load_course_rules(courses_path: str | os.PathLike = COURSES_JSON,
+                      year_to_folder_path: str | os.PathLike = YEAR_TO_FOLDER_JSON,
+                      cache_path: str | os.PathLike = RULES_CACHE) -> RuleManager:
+    """
+    Builds the rules the CLI and GUI sort with, limited to the years in year_to_folder.json.
+    The compiled rules are cached in cache_path like RuleParser.load(), keyed on both files.
+    """
+    def build() -> RuleManager:
+        with open(courses_path, "r") as f:
+            courses_json = json.load(f)
+        with open(year_to_folder_path, "r") as f:
+            year_to_folder = json.load(f)
+        return build_course_rules(courses_json, year_to_folder.values())
+
+    return load_cached(cache_key([courses_path, year_to_folder_path]), build, cache_path)
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum
+from pathlib import Path
+from typing import Iterable
+
+BLOCK_SIZE = 64 * 1024
+HASH_ALGORITHM = "blake2b"
+DEFAULT_WORKERS = 4
+
+EDGES = "edges"
+FULL = "full"
+
+
+class DuplicateAction(StrEnum):
+    SKIP = "skip"
+    REMOVE = "remove"
+
+
+class HashCache:
+    """
+    On-disk cache of file digests keyed on (path, size, mtime_ns), so unchanged files are
+    never hashed twice. Lookups are served from memory; new digests are written by save().
+    """
+
+    def __init__(self, db_path: str | os.PathLike) -> None:
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS hashes (
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest BLOB NOT NULL,
+                PRIMARY KEY (path, kind)
+            )
+        """)
+        self.digests: dict[tuple[str, str], tuple[int, int, bytes]] = {}
+        for path, kind, size, mtime_ns, digest in self.connection.execute("SELECT * FROM hashes"):
+            self.digests[(path, kind)] = (size, mtime_ns, digest)
+        self.changed: dict[tuple[str, str], tuple[int, int, bytes]] = {}
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, path: str, kind: str, size: int, mtime_ns: int) -> bytes | None:
+        entry = self.digests.get((path, kind))
+        if entry is not None and entry[0] == size and entry[1] == mtime_ns:
+            return entry[2]
+        return None
+
+    def put(self, path: str, kind: str, size: int, mtime_ns: int, digest: bytes):
+        self.digests[(path, kind)] = self.changed[(path, kind)] = (size, mtime_ns, digest)
+
+    def save(self):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO hashes (path, kind, size, mtime_ns, digest) VALUES (?, ?, ?, ?, ?)",
+                [(path, kind, size, mtime_ns, digest) for (path, kind), (size, mtime_ns, digest) in self.changed.items()],
+            )
+        self.changed.clear()
+
+    def close(self):
+        self.connection.close()
+
+
+def hash_edges(path: Path, size: int) -> bytes:
+    """
+    Hashes the first and last block of a file. For files up to two blocks long this covers every byte.
+    """
+    digest = hashlib.new(HASH_ALGORITHM)
+    with open(path, "rb") as f:
+        digest.update(f.read(BLOCK_SIZE))
+        if size > BLOCK_SIZE:
+            f.seek(max(BLOCK_SIZE, size - BLOCK_SIZE))
+            digest.update(f.read(BLOCK_SIZE))
+    return digest.digest()
+
+
+def hash_full(path: Path) -> bytes:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, HASH_ALGORITHM).digest()
+
+
+class DuplicateFinder:
+    """
+    Decides whether two files have identical content, cheapest check first:
+    size, then a hash of the first and last blocks, then a hash of the whole file.
+    Pairs are checked on a thread pool; hashlib releases the GIL while hashing.
+    """
+
+    def __init__(self, cache: HashCache | None = None, workers: int = DEFAULT_WORKERS) -> None:
+        self.cache = cache
+        self.workers = workers
+
+    def digest(self, path: Path, kind: str, size: int, mtime_ns: int) -> bytes:
+        if self.cache is not None:
+            cached = self.cache.get(str(path), kind, size, mtime_ns)
+            if cached is not None:
+                return cached
+
+        digest = hash_edges(path, size) if kind == EDGES else hash_full(path)
+        if self.cache is not None:
+            self.cache.put(str(path), kind, size, mtime_ns, digest)
+        return digest
+
+    def is_duplicate(self, a: Path, b: Path) -> bool:
+        try:
+            stat_a, stat_b = a.stat(), b.stat()
+            if stat_a.st_size != stat_b.st_size:
+                return False
+
+            size = stat_a.st_size
+            if self.digest(a, EDGES, size, stat_a.st_mtime_ns) != self.digest(b, EDGES, size, stat_b.st_mtime_ns):
+                return False
+            if size <= 2 * BLOCK_SIZE:
+                return True
+
+            return self.digest(a, FULL, size, stat_a.st_mtime_ns) == self.digest(b, FULL, size, stat_b.st_mtime_ns)
+        except OSError:
+            return False
+
+    def find(self, pairs: Iterable[tuple[Path, Path]]) -> list[bool]:
+        """
+        Returns, for each (a, b) pair, whether the two files are identical.
+        """
+        pairs = list(pairs)
+        if len(pairs) <= 1:
+            return [self.is_duplicate(a, b) for a, b in pairs]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda pair: self.is_duplicate(*pair), pairs))
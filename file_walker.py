@@ -0,0 +1,67 @@
+import os
+import re
+import stat
+import threading
+from fnmatch import translate
+from typing import Iterable, Iterator
+
+
+def compile_globs(globs: Iterable[str]) -> re.Pattern | None:
+    """
+    Combines glob patterns into a single regex, or None if there are no patterns.
+    """
+    patterns = [translate(os.path.normcase(glob)) for glob in globs]
+    if not patterns:
+        return None
+    return re.compile("|".join(patterns))
+
+
+def is_hidden(entry: os.DirEntry) -> bool:
+    if entry.name.startswith("."):
+        return True
+
+    # On Windows the hidden attribute comes from the directory listing, so this stat is free
+    if os.name == "nt":
+        attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+        return bool(attributes & stat.FILE_ATTRIBUTE_HIDDEN)  # type: ignore[attr-defined]
+
+    return False
+
+
+def walk_files(root: str | os.PathLike, exclude: Iterable[str] = (), max_depth: int | None = None,
+               skip_hidden: bool = True, cancel: threading.Event | None = None) -> Iterator[os.DirEntry]:
+    """
+    Lazily yields a DirEntry for every file under root.
+    Walks iteratively with os.scandir, so deep trees can't hit the recursion limit and memory
+    only grows with the number of directories waiting to be visited.
+
+    exclude: glob patterns matched against entry names; matching files and folders are skipped
+    max_depth: 0 yields only the files directly in root, None walks the whole tree
+    skip_hidden: skips dot-files and, on Windows, entries with the hidden attribute
+    cancel: stops the walk at the next entry once set
+    """
+    excluded = compile_globs(exclude)
+    stack: list[tuple[str, int]] = [(os.fspath(root), 0)]
+
+    while stack:
+        folder, depth = stack.pop()
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if cancel is not None and cancel.is_set():
+                        return
+                    if skip_hidden and is_hidden(entry):
+                        continue
+                    if excluded is not None and excluded.match(os.path.normcase(entry.name)):
+                        continue
+
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if max_depth is None or depth < max_depth:
+                                stack.append((entry.path, depth + 1))
+                        elif entry.is_file():
+                            yield entry
+                    except OSError:
+                        continue
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            continue
@@ -1,113 +1,30 @@
+import argparse
 import customtkinter as ctk
 import json
+import queue
+import threading
 
-from typing import TypedDict
+from collections import Counter
+from typing import Iterator
 from pathlib import Path
 from colorama import Fore
-from tkinter import Variable
 from Course import Course
-from enum import StrEnum
+from CourseIndex import CourseIndex
+from course_rules import build_course_rules
+from RuleManager import RuleManager
+from scanner import scan_rules
+from mover import MoveStatus
+from MoveExecutor import MoveExecutor
+from journal import JOURNAL_PATH, MoveJournal
+from MovePlanner import Collision, MovePlanner
+from duplicates import DuplicateAction, DuplicateFinder, HashCache
+from ScanIndex import ScanIndex, config_hash
+from PayloadStore import Payload, PayloadStore
+from profiler import NullProfiler, Profiler
+from VirtualTable import VirtualTable
 from math import e
 from colorama import Fore
-from terminal_utils import pretty_substring, user_choice_bool
-
-
-class Folder(StrEnum):
-    LAB = "Lab"
-    ASSIGNMENT = "Assignment"
-    REVIEW = "Review"
-    LECTURE = "Lecture"
-    TUTORIAL = "Tutorial"
-    INFO = "Info"
-    OTHER = "Other"
-
-
-class Payload():
-    def __init__(self, src: Path, dst: Path):
-        self.src = src
-        self.dst = self.generate_dst_path(dst)
-        self.sent = False
-        self.staged = False
-        self.checkbox = None
-
-    def to_tuple(self):
-        return (self.checkbox, self.src, self.dst)
-
-    def setCheckbox(self, checkbox: ctk.CTkCheckBox):
-        self.checkbox = checkbox
-
-    def toggle_staged(self):
-        self.staged = not self.staged
-
-    def set_staged(self, staged: bool):
-        self.staged = staged
-
-    def generate_dst_path(self, dst: Path):
-        sub_folder = ""
-
-        for folder in Folder:
-            if folder in self.src.name:
-                sub_folder = folder
-                break
-
-        return dst.joinpath(sub_folder, self.src.name)
-
-    def __repr__(self):
-        data = {
-            'staged': {self.staged},
-            'sent': {self.sent},
-            'src': {self.src.name},
-            'dst': {self.dst.parent.name},
-        }
-        return f"{data}"
-
-    __str__ = __repr__
-
-    def send(self, send_enabled=False) -> bool:
-        """
-        Sends a file from src to dst. Prints out certain results.
-        Returns True on success, False otherwise.
-        """
-
-        def log(from_path, to_path, status_msg="", color=Fore.RESET):
-            print(f"{color}From: {from_path}\n  To: {to_path} \n{status_msg}{Fore.RESET}\n")
-
-        if not send_enabled:
-            log(self.src, self.dst, "Sending Not Enabled", Fore.YELLOW)
-            return False
-
-        try:
-
-            if not self.src.exists():
-                log(self.src, self.dst, "Src File Does Not Exist", Fore.YELLOW)
-                return False
-
-            if self.dst.exists():
-                log(self.src, self.dst, "Dst File Already Exists", Fore.YELLOW)
-                return False
-
-            if not self.dst.parent.exists():
-                log(self.src, pretty_substring(str(self.dst), self.dst.parent.name),
-                    f"'{self.dst.parent.name}' Does Not Exist", Fore.YELLOW)
-                if self.prompt_to_create_folder(self.dst.parent.name):
-                    self.dst.parent.mkdir(parents=True, exist_ok=True)
-                else:
-                    return False
-
-            self.src.rename(self.dst)
-            log(self.src, self.dst, "SUCCESS", Fore.GREEN)
-            return True
-
-        except FileNotFoundError as e:
-            log(self.src, self.dst, f"File Not Found: {e}", Fore.RED)
-            return False
-
-        except Exception as error:
-            print(Fore.RED + f"Unexpected Error: {error}" + Fore.RESET)
-            return False
-
-    def prompt_to_create_folder(self, folder_name: str):
-        return user_choice_bool(f"Create {folder_name}? (y/n): ")
+from terminal_utils import user_choice_bool
 
 
 # Set appearance and theme
@@ -117,49 +34,54 @@ ctk.set_default_color_theme("blue")  # themes: "blue", "green", "dark-blue"
 BASE_DST_PATH = Path("C:/Users/morri/Onedrive/University")
 BASE_SRC_PATH = Path("C:/Users/morri/Downloads")
 COURSE_JSON = "./courses.json"
+YEAR_TO_FOLDER_JSON = "./year_to_folder.json"
+SCAN_INDEX_DB = "./scan_index.sqlite3"
+COLLISION = Collision.SKIP  # or Collision.SUFFIX to keep both files as "name (1).ext"
+DUPLICATE_ACTION = DuplicateAction.SKIP  # or DuplicateAction.REMOVE to delete sources already at their destination
+SCAN_BATCH = 500  # payloads handed to the UI at a time
+SCAN_DRAIN_MS = 50
+SEND_DRAIN_MS = 50
 
 
-class FileRow(TypedDict):
-    payload: Payload
-    var: Variable
-    checkbox: ctk.CTkCheckBox
-    src_frame: ctk.CTkFrame
-    dst_frame: ctk.CTkFrame
-
-
-def traverse_folder(src_folder_path: Path, built_course_dict: dict) -> list[Payload]:
-    files_to_be_sent: list[Payload] = []
+# (src, dst, course code, year, folder) for one matched file; turned into a Payload on the UI thread
+ScanHit = tuple[str, Path, str, str, str | None]
 
-    for file in src_folder_path.iterdir():
 
-        if file.is_dir():
-            files_to_be_sent += traverse_folder(file, built_course_dict)
-        else:
-            for course_code in built_course_dict:
-                if course_code in file.name:
-                    course: Course = built_course_dict[course_code]
-                    payload = Payload(file, course.dst_path)
-                    files_to_be_sent.append(payload)
-
-    return files_to_be_sent
+def traverse_folder(src_folder_path: Path, course_index: CourseIndex, rule_manager: RuleManager,
+                    scan_index: ScanIndex, cancel: threading.Event | None = None) -> Iterator[ScanHit]:
+    for entry, result in scan_rules(src_folder_path, rule_manager, scan_index, cancel=cancel):
+        course = course_index.get(result.rules[0])
+        if course is not None:
+            folder = result.rules[1] if len(result.rules) > 1 else None
+            yield (entry.path, BASE_DST_PATH.joinpath(result.path, entry.name), course.course_code,
+                   course.dst_path.parent.parent.name, folder)
 
 
 class GUIApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, profiler: Profiler | NullProfiler | None = None):
         super().__init__()
+        self.profiler = profiler or NullProfiler()
         with open(COURSE_JSON, "r") as f:
             self.courses_json = json.load(f)
-        self.built_courses_dict = {}
-        self.payloads_to_send = []
+        self.course_index = CourseIndex()
+        self.store = PayloadStore()
 
-        self.load_data()
+        # Scans run on a worker thread and hand batches of payloads over through this queue
+        self.scan_queue: queue.Queue[tuple[int, list[ScanHit] | None]] = queue.Queue()
+        self.scan_generation = 0
+        self.scan_cancel = threading.Event()
+        # Held while a worker has the scan index open, so a reload waits for the scan it cancelled
+        self.scan_lock = threading.Lock()
+        self.scanning = False
 
         self.geometry("1000x600")
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.header = ctk.CTkFrame(self, height=100)
         self.header.pack(fill="x", padx=10, pady=10)
         header_buttons = [
-            {"text": "Reload", "command": self.load_data},
+            {"text": "Reload", "command": self.start_scan},
+            {"text": "Cancel Scan", "command": self.cancel_scan},
         ]
         for col, button in enumerate(header_buttons):
             button = ctk.CTkButton(
@@ -167,15 +89,16 @@ class GUIApp(ctk.CTk):
                 text=button.get("text", "Error"),
                 command=button.get("command", "Error"),
             )
-            button.pack(anchor="e")
+            button.pack(side="right", padx=2)
 
-        # Scrollable frame for rows
-        self.table = ctk.CTkScrollableFrame(self)
-        self.table.grid_columnconfigure(0, weight=1)   # checkbox col
-        self.table.grid_columnconfigure(1, weight=9)               # source col
-        self.table.grid_columnconfigure(2, weight=9)               # dest col
-        self.table.pack(fill="both", expand=True, padx=10, pady=10)
+        self.scan_progress = ctk.CTkProgressBar(self.header, mode="indeterminate")
+        self.scan_progress.pack(side="left", padx=5)
+        self.scan_status = ctk.CTkLabel(self.header, text="", anchor="w")
+        self.scan_status.pack(side="left", fill="x", expand=True, padx=5)
 
+        # Control bar
+        self.control_bar = ctk.CTkFrame(self)
+        self.control_bar.pack(fill="x", padx=10)
         self.is_selecting_all = False
 
         control_bar_buttons = [
@@ -186,89 +109,144 @@ class GUIApp(ctk.CTk):
         ]
 
         for col, button in enumerate(control_bar_buttons):
+            self.control_bar.grid_columnconfigure(col, weight=1)
             button = ctk.CTkButton(
-                self.table,
+                self.control_bar,
                 text=button.get("text", "Error"),
                 command=button.get("command", "Error"),
             )
             button.grid(row=0, column=col, padx=2, pady=2, sticky="nsew")
 
-        # Store checkboxes
-        self.checkbox_vars = []
-
-        self.rows: list[FileRow] = []  # list of dicts with widgets per row
-
-        # Add rows
-        for row, payload in enumerate(self.payloads_to_send, start=1):
-            var = ctk.BooleanVar(value=payload.staged)
-
-            def on_toggle(v=var, p=payload):
-                p.staged = v.get()  # update payload
-                print(f"{p}")
-
-            cb = ctk.CTkCheckBox(
-                self.table,
-                text="",
-                variable=var,
-                command=on_toggle
-            )
-            cb.grid(row=row, column=0, padx=5, pady=5)
-
-            # Source subframe
-            src_frame = ctk.CTkFrame(self.table)
-            src_frame.grid(row=row, column=1, sticky="nsew", padx=5, pady=5)
-            src_frame.grid_columnconfigure(0, weight=1)  # allows internal widgets to expand
-
-            src_label = ctk.CTkLabel(
-                src_frame,
-                text=self.truncate_text(str(payload.src.relative_to(BASE_SRC_PATH)), 50),
-                anchor="w",
-            )
-            src_label.pack(fill="both", expand=True)
-
-            # Destination subframe
-            dst_frame = ctk.CTkFrame(self.table)
-            dst_frame.grid(row=row, column=2, sticky="nsew", padx=5, pady=5)
-            dst_frame.grid_columnconfigure(0, weight=1)
+        # Only the visible rows have widgets; staged state lives on the payloads
+        self.table = VirtualTable(self, self.row_text, on_toggle=print)
+        self.table.pack(fill="both", expand=True, padx=10, pady=10)
+        self.table.set_items(self.store)
+
+        # Send bar
+        self.send_queue: queue.Queue[tuple[int, MoveStatus, str | None, bool] | None] = queue.Queue()
+        self.send_cancel = threading.Event()
+        self.sending = False
+        self.send_total = 0
+        self.send_processed = 0
+        self.send_done_ids: set[int] = set()
+        self.send_summary: Counter[str] = Counter()
+
+        self.send_bar = ctk.CTkFrame(self)
+        self.send_bar.pack(fill="x", padx=10, pady=(0, 10))
+        self.send_progress = ctk.CTkProgressBar(self.send_bar)
+        self.send_progress.set(0)
+        self.send_progress.pack(side="left", padx=5)
+        self.send_status = ctk.CTkLabel(self.send_bar, text="", anchor="w")
+        self.send_status.pack(side="left", fill="x", expand=True, padx=5)
+        self.send_cancel_button = ctk.CTkButton(self.send_bar, text="Cancel Send", command=self.cancel_send)
+        self.send_cancel_button.pack(side="right", padx=2)
+
+        self.start_scan()
 
-            dst_label = ctk.CTkLabel(
-                dst_frame,
-                text=self.truncate_text(str(payload.dst.relative_to(BASE_DST_PATH)), 50),
-                anchor="w",
-            )
-            dst_label.pack(fill="both", expand=True)
+    def start(self):
+        self.mainloop()
 
-            # Store var reference so select all can easily iterate through
-            self.checkbox_vars.append(var)
+    def on_close(self):
+        self.scan_cancel.set()
+        self.send_cancel.set()
+        self.destroy()
 
-            # Store row widgets for easy deletion later
-            self.rows.append({
-                "payload": payload,
-                "var": var,
-                "checkbox": cb,
-                "src_frame": src_frame,
-                "dst_frame": dst_frame
-            })
+    def load_rules(self) -> tuple[CourseIndex, RuleManager]:
+        course_index = CourseIndex()
 
-    def start(self):
-        self.mainloop()
+        with self.profiler.stage("load_courses"):
+            for folder in BASE_DST_PATH.iterdir():
+                if folder.is_dir() and folder.name in self.courses_json:
+                    for semester in self.courses_json[folder.name]:
+                        if semester in self.courses_json[folder.name]:
+                            for course_code, course_json in self.courses_json[folder.name][semester].items():
+                                parent_path = folder.absolute().joinpath(semester)
+                                c = Course(course_code, course_json, parent_path)
+                                course_index.add(c)
 
-    def load_data(self):
-        built_course_dict: dict[str, Course] = {}
+            with open(YEAR_TO_FOLDER_JSON, "r") as f:
+                year_to_folder: dict[str, str] = json.load(f)
+            rule_manager = build_course_rules(self.courses_json, year_to_folder.values())
 
-        for folder in BASE_DST_PATH.iterdir():
-            if folder.is_dir() and folder.name in self.courses_json:
-                for semester in self.courses_json[folder.name]:
-                    if semester in self.courses_json[folder.name]:
-                        for course_code, course_json in self.courses_json[folder.name][semester].items():
-                            parent_path = folder.absolute().joinpath(semester)
-                            c = Course(course_code, course_json, parent_path)
-                            built_course_dict[course_code] = c
+        self.profiler.instrument_rules(rule_manager)
+        return course_index, rule_manager
 
-                            alt_course_code = course_code[0:4] + " " + course_code[4:]
-                            built_course_dict[alt_course_code] = c
+    def start_scan(self):
+        """
+        Cancels any running scan, clears the table and starts scanning again in the background.
+        """
+        self.scan_cancel.set()
+        self.scan_cancel = threading.Event()
+        self.scan_generation += 1
+        self.store = PayloadStore()
+        self.table.set_items(self.store)
+
+        self.scan_status.configure(text="Scanning...")
+        self.scan_progress.start()
+        threading.Thread(target=self.scan_worker, args=(self.scan_generation, self.scan_cancel), daemon=True).start()
+        if not self.scanning:
+            self.scanning = True
+            self.after(SCAN_DRAIN_MS, self.drain_scan_queue)
+
+    def cancel_scan(self):
+        self.scan_cancel.set()
+
+    def scan_worker(self, generation: int, cancel: threading.Event):
+        """
+        Runs on a worker thread. Never touches widgets: results only leave through scan_queue.
+        """
+        batch: list[ScanHit] = []
+        try:
+            course_index, rule_manager = self.load_rules()
+            with self.profiler.stage("scan"), self.scan_lock:
+                with ScanIndex(SCAN_INDEX_DB, config_hash([COURSE_JSON, YEAR_TO_FOLDER_JSON])) as scan_index:
+                    for hit in traverse_folder(BASE_SRC_PATH, course_index, rule_manager, scan_index, cancel):
+                        batch.append(hit)
+                        if len(batch) >= SCAN_BATCH:
+                            self.scan_queue.put((generation, batch))
+                            batch = []
+                    # Pruning after a partial scan would drop the entries it didn't reach
+                    scan_index.save(prune=not cancel.is_set(), root=BASE_SRC_PATH)
+            if not cancel.is_set():
+                self.course_index = course_index
+        except Exception as error:
+            print(f"Error during scan: {error}")
+        finally:
+            if batch:
+                self.scan_queue.put((generation, batch))
+            self.scan_queue.put((generation, None))
 
-        self.payloads_to_send = traverse_folder(BASE_SRC_PATH, built_course_dict)
+    def drain_scan_queue(self):
+        """
+        Moves whatever the scan worker has produced into the table, then reschedules itself
+        until the current scan has finished.
+        """
+        finished = False
+        while True:
+            try:
+                generation, batch = self.scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.scan_generation:
+                continue  # left over from a scan that was restarted
+            if batch is None:
+                finished = True
+            else:
+                for hit in batch:
+                    self.store.add(*hit)
+
+        self.table.set_items(self.store)
+        count = len(self.store)
+        if not finished:
+            self.scan_status.configure(text=f"Scanning... {count} files found")
+            self.after(SCAN_DRAIN_MS, self.drain_scan_queue)
+            return
+
+        self.scanning = False
+        self.scan_progress.stop()
+        cancelled = " (cancelled)" if self.scan_cancel.is_set() else ""
+        self.scan_status.configure(text=f"{count} files found{cancelled}")
+        self.profiler.count("payloads", count)
 
     def filter_src(self):
         print("Filter src")
@@ -278,43 +256,138 @@ class GUIApp(ctk.CTk):
 
     def select_all(self):
         self.is_selecting_all = not self.is_selecting_all  # If already on, turn off and vice versa
-        for var, payload in zip(self.checkbox_vars, self.payloads_to_send):
-
-            var.set(self.is_selecting_all)
+        for payload in self.store:
             payload.staged = self.is_selecting_all
-            print(f"{payload} staged → {payload.staged}")
+        print(f"{len(self.store)} staged → {self.is_selecting_all}")
+        self.table.render()
+
+    def row_text(self, payload: Payload) -> tuple[str, str]:
+        return (self.truncate_text(str(payload.src.relative_to(BASE_SRC_PATH)), 50),
+                self.truncate_text(str(payload.dst.relative_to(BASE_DST_PATH)), 50))
 
     def truncate_text(self, text, max_chars=30):
         return text if len(text) <= max_chars else text[:max_chars-3] + "..."
 
+    def prompt_to_create_folders(self, folders: list[Path]) -> bool:
+        print("Missing folders:")
+        for folder in folders:
+            print(f"  {folder}")
+        return user_choice_bool(f"Create {len(folders)} folder(s)? (y/n): ")
+
     def send_payloads(self):
-        to_delete: list[FileRow] = []
-        for row in self.rows:
-            payload: Payload = row["payload"]
-            if payload.staged:
-                try:
-                    if payload.send(send_enabled=True):  # send file
-                        # Cleanup on success
-                        to_delete.append(row)
-                    else:
-                        print("Error during send()")
-                except Exception as e:
-                    print(f"ERROR: {e}")
-                    continue
-
-        # Can't delete while iterating, so must use auxilary list
-        for row in to_delete:
-            row["checkbox"].destroy()
-            row["src_frame"].destroy()
-            row["dst_frame"].destroy()
-            self.rows.remove(row)
-            self.checkbox_vars.remove(row["var"])
-            self.payloads_to_send.remove(row["payload"])
-
-
-def main():
-    app = GUIApp()
-    app.start()
+        """
+        Starts moving the staged payloads on a worker thread; drain_send_queue() reports progress.
+        """
+        if self.sending:
+            return
+
+        staged = self.store.staged()
+        if not staged:
+            self.send_status.configure(text="Nothing staged")
+            return
+
+        self.sending = True
+        self.send_cancel = threading.Event()
+        self.send_total = len(staged)
+        self.send_processed = 0
+        self.send_done_ids = set()
+        self.send_summary = Counter()
+        self.send_progress.set(0)
+        self.send_status.configure(text=f"Planning {len(staged)} files...")
+
+        threading.Thread(target=self.send_worker, args=(staged, self.send_cancel), daemon=True).start()
+        self.after(SEND_DRAIN_MS, self.drain_send_queue)
+
+    def cancel_send(self):
+        self.send_cancel.set()
+
+    def send_worker(self, staged: list[Payload], cancel: threading.Event):
+        """
+        Runs on a worker thread. Reports (payload id, status, error, remove row) per file
+        through send_queue, then None once it stops.
+        """
+        try:
+            moves = [(payload.src, payload.dst) for payload in staged]
+            with self.profiler.stage("plan", files=len(moves)), HashCache(SCAN_INDEX_DB) as hash_cache:
+                plan = MovePlanner(COLLISION, DuplicateFinder(hash_cache)).plan(moves, self.prompt_to_create_folders)
+                hash_cache.save()
+
+            ready: list[Payload] = []
+            for payload, planned in zip(staged, plan):
+                if planned.ready:
+                    payload.dst = planned.dst
+                    ready.append(payload)
+                elif planned.status == MoveStatus.DUPLICATE and DUPLICATE_ACTION == DuplicateAction.REMOVE:
+                    planned.src.unlink(missing_ok=True)
+                    self.send_queue.put((payload.id, MoveStatus.DUPLICATE, None, True))
+                else:
+                    print(f"Error during send(): {planned.src.name} ({planned.status})")
+                    self.send_queue.put((payload.id, planned.status, None, False))  # type: ignore
+
+            moves = [(payload.src, payload.dst) for payload in ready]
+            with self.profiler.stage("send", files=len(moves)):
+                # On cancel the executor reports the moves that haven't started as cancelled and still
+                # reports the ones that ran; the batch stays open in the journal, so `resume` can finish it
+                results = MoveJournal(JOURNAL_PATH).execute(MoveExecutor(cancel=cancel), moves)
+                for payload, result in zip(ready, results):
+                    moved = result.status == MoveStatus.MOVED
+                    if not moved and result.status != MoveStatus.CANCELLED:
+                        print(f"Error during send(): {result.src.name} ({result.error or result.status})")
+                    self.send_queue.put((payload.id, result.status, result.error, moved))
+        except Exception as error:
+            print(f"Error during send(): {error}")
+        finally:
+            self.send_queue.put(None)
+
+    def drain_send_queue(self):
+        finished = False
+        while True:
+            try:
+                message = self.send_queue.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                finished = True
+                break
+
+            payload_id, status, error, remove = message
+            self.send_processed += 1
+            self.send_summary[str(status)] += 1
+            if remove:
+                self.send_done_ids.add(payload_id)
+
+        self.send_progress.set(self.send_processed / self.send_total)
+        if not finished:
+            self.send_status.configure(text=f"Sending... {self.send_processed}/{self.send_total}")
+            self.after(SEND_DRAIN_MS, self.drain_send_queue)
+            return
+
+        # Remove every finished row in one pass, keyed by payload id
+        for payload_id in self.send_done_ids:
+            payload = self.store.get(payload_id)
+            if payload is not None:
+                payload.sent = True
+        self.store.remove(self.send_done_ids)
+        self.table.set_items(self.store)
+
+        self.sending = False
+        cancelled = " (cancelled)" if self.send_cancel.is_set() else ""
+        summary = ", ".join(f"{count} {status}" for status, count in self.send_summary.most_common())
+        self.send_status.configure(text=f"{summary or 'Nothing sent'}{cancelled}")
+        self.profiler.count("sent", self.send_summary[str(MoveStatus.MOVED)])
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Sort course files from Downloads into the University folder")
+    parser.add_argument("--profile", metavar="TRACE_JSON", help="write a Chrome trace of the session to this file")
+    args = parser.parse_args(argv)
+
+    profiler = Profiler() if args.profile else NullProfiler()
+    app = GUIApp(profiler)
+    try:
+        app.start()
+    finally:
+        profiler.write(args.profile)
 
 
 if __name__ == "__main__":
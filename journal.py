@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from mover import MoveStatus
+from MoveExecutor import MoveExecutor, MoveResult
+
+JOURNAL_PATH = "./move_journal.ndjson"
+
+MOVE = "move"
+UNDO = "undo"
+
+
+@dataclass
+class Batch:
+    batch: str
+    kind: str
+    undoes: str | None = None
+    intents: list[tuple[Path, Path]] = field(default_factory=list)
+    done: dict[int, MoveStatus] = field(default_factory=dict)
+    ended: bool = False
+
+    def unfinished(self) -> list[int]:
+        return [seq for seq in range(len(self.intents)) if seq not in self.done]
+
+
+class MoveJournal:
+    """
+    Append-only, newline-delimited JSON log of moves.
+    Every move of a batch is recorded (and fsynced) before any of them runs, and each
+    completion is appended as it happens, so an interrupted batch can be resumed or undone
+    using only the paths in the journal.
+    """
+
+    def __init__(self, path: str | os.PathLike = JOURNAL_PATH) -> None:
+        self.path = Path(path)
+
+    def append(self, records: list[dict], sync: bool = False):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+
+    def begin(self, moves: list[tuple[Path, Path]], kind: str = MOVE, undoes: str | None = None) -> str:
+        batch = uuid.uuid4().hex[:12]
+        records = [{"type": "batch", "batch": batch, "kind": kind, "undoes": undoes, "time": time.time()}]
+        records += [{"type": "intent", "batch": batch, "seq": seq, "src": str(src), "dst": str(dst)}
+                    for seq, (src, dst) in enumerate(moves)]
+        self.append(records, sync=True)
+        return batch
+
+    def complete(self, batch: str, seq: int, status: MoveStatus):
+        self.append([{"type": "done", "batch": batch, "seq": seq, "status": str(status)}])
+
+    def end(self, batch: str):
+        self.append([{"type": "end", "batch": batch}], sync=True)
+
+    def read(self) -> dict[str, Batch]:
+        """
+        Returns every batch in the journal, oldest first. A torn last line from a crash is ignored.
+        """
+        batches: dict[str, Batch] = {}
+        if not self.path.exists():
+            return batches
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                kind = record["type"]
+                if kind == "batch":
+                    batches[record["batch"]] = Batch(record["batch"], record["kind"], record.get("undoes"))
+                elif record["batch"] not in batches:
+                    continue
+                elif kind == "intent":
+                    batches[record["batch"]].intents.append((Path(record["src"]), Path(record["dst"])))
+                elif kind == "done":
+                    batches[record["batch"]].done[record["seq"]] = MoveStatus(record["status"])
+                elif kind == "end":
+                    batches[record["batch"]].ended = True
+        return batches
+
+    def execute(self, executor: MoveExecutor, moves: Iterable[tuple[Path, Path]], kind: str = MOVE,
+                undoes: str | None = None) -> Iterator[MoveResult]:
+        """
+        Runs the moves through the executor, journaling intents before and completions after.
+        A batch with cancelled moves is left open, so `resume` can finish it.
+        """
+        moves = list(moves)
+        batch = self.begin(moves, kind, undoes)
+        done = 0
+        for seq, result in enumerate(executor.run(moves)):
+            if result.status != MoveStatus.CANCELLED:
+                self.complete(batch, seq, result.status)
+                done += 1
+            yield result
+        if done == len(moves):
+            self.end(batch)
+
+
+def resume(journal: MoveJournal, executor: MoveExecutor, batch_id: str | None = None) -> Iterator[MoveResult]:
+    """
+    Finishes the moves that an interrupted batch never recorded as done.
+    A move that already happened before the interruption (src gone, dst present) is recorded
+    as moved without touching the filesystem.
+    """
+    batches = journal.read()
+    pending = [batches[batch_id]] if batch_id else [batch for batch in batches.values() if not batch.ended]
+
+    for batch in pending:
+        seqs = batch.unfinished()
+        todo: list[int] = []
+        for seq in seqs:
+            src, dst = batch.intents[seq]
+            if not src.exists() and dst.exists():
+                journal.complete(batch.batch, seq, MoveStatus.MOVED)
+                yield MoveResult(src, dst, MoveStatus.MOVED)
+            else:
+                todo.append(seq)
+
+        done = 0
+        for seq, result in zip(todo, executor.run(batch.intents[seq] for seq in todo)):
+            if result.status != MoveStatus.CANCELLED:
+                journal.complete(batch.batch, seq, result.status)
+                done += 1
+            yield result
+        if done == len(todo):
+            journal.end(batch.batch)
+
+
+def undo(journal: MoveJournal, executor: MoveExecutor, batch_id: str | None = None) -> Iterator[MoveResult]:
+    """
+    Moves every file of a batch back to where it came from, as a new journaled batch.
+    Defaults to the most recent move batch that hasn't been undone.
+    """
+    batches = journal.read()
+    undone = {batch.undoes for batch in batches.values() if batch.kind == UNDO}
+
+    if batch_id is None:
+        candidates = [batch for batch in batches.values() if batch.kind == MOVE and batch.batch not in undone]
+        if not candidates:
+            return
+        batch = candidates[-1]
+    else:
+        batch = batches[batch_id]
+
+    moves: list[tuple[Path, Path]] = []
+    for seq, (src, dst) in enumerate(batch.intents):
+        status = batch.done.get(seq)
+        # A move interrupted before its completion was recorded may still have happened
+        if status == MoveStatus.MOVED or (status is None and not src.exists() and dst.exists()):
+            moves.append((dst, src))
+
+    yield from journal.execute(executor, moves, UNDO, undoes=batch.batch)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Resume or undo journaled moves")
+    parser.add_argument("command", choices=["resume", "undo", "list"])
+    parser.add_argument("--batch", help="batch id (defaults to unfinished batches for resume, last batch for undo)")
+    parser.add_argument("--journal", default=JOURNAL_PATH, help="journal file")
+    args = parser.parse_args(argv)
+
+    journal = MoveJournal(args.journal)
+
+    if args.command == "list":
+        for batch in journal.read().values():
+            state = "complete" if batch.ended else f"{len(batch.unfinished())} unfinished"
+            undoes = f" of {batch.undoes}" if batch.undoes else ""
+            print(f"{batch.batch} {batch.kind}{undoes}: {len(batch.intents)} moves, {state}")
+        return
+
+    if args.batch and args.batch not in journal.read():
+        print(f"No batch {args.batch} in {args.journal}")
+        exit(1)
+
+    command = resume if args.command == "resume" else undo
+    for result in command(journal, MoveExecutor(), args.batch):
+        error = f" ({result.error})" if result.error else ""
+        print(f"[{result.status}] {result.src} -> {result.dst}{error}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,42 @@
+from enum import StrEnum
+from pathlib import Path
+from typing import Callable
+
+
+class MoveStatus(StrEnum):
+    MOVED = "moved"
+    SKIPPED_EXISTS = "skipped-exists"
+    MISSING_SRC = "missing-src"
+    MISSING_FOLDER = "missing-folder"
+    DUPLICATE = "duplicate"
+    CHANGED = "changed"  # src was modified after the move was planned
+    CANCELLED = "cancelled"  # never attempted because the batch was cancelled
+    ERROR = "error"
+
+
+def move_file(src: Path, dst: Path, confirm_create: Callable[[Path], bool] | None = None) -> MoveStatus:
+    """
+    Moves src to dst without ever overwriting an existing file.
+    One exists() check on dst guards the rename, since a POSIX rename replaces an existing
+    file; src and the destination folder are only checked if the rename fails. A missing
+    destination folder is created only if confirm_create(folder) returns True.
+    Unexpected OS errors are raised to the caller.
+    """
+    if dst.exists():
+        return MoveStatus.SKIPPED_EXISTS
+
+    try:
+        src.rename(dst)
+        return MoveStatus.MOVED
+    except FileNotFoundError:
+        if not src.exists():
+            return MoveStatus.MISSING_SRC
+        if dst.parent.exists():
+            raise
+
+    if confirm_create is None or not confirm_create(dst.parent):
+        return MoveStatus.MISSING_FOLDER
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    src.rename(dst)
+    return MoveStatus.MOVED
@@ -0,0 +1,137 @@
+import asyncio
+import concurrent.futures
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterable
+
+from file_walker import walk_files
+from MovePlanner import Collision, MovePlanner, PlannedMove
+from mover import MoveStatus
+from RuleManager import RuleManager
+from sorter import print_plan
+
+BATCH_SIZE = 256
+QUEUE_BATCHES = 8  # batches a stage may run ahead of the next one before it has to wait
+
+
+class Pipeline:
+    """
+    Non-interactive sort as three concurrent stages connected by bounded queues:
+    walker (scandir, in a thread) → classifier (rule matching, in an executor) →
+    mover (planning and journaled moves, in an executor). Files flow through in batches,
+    so the first moves start while the walk is still going, and a full queue makes the
+    stage before it wait instead of buffering the whole tree in memory.
+    """
+
+    def __init__(self, src_root: Path, dst_root: Path, rule_manager: RuleManager, exclude: Iterable[str] = (),
+                 max_depth: int | None = None, collision: Collision = Collision.SKIP, create_folders: bool = False,
+                 journal_path: str | None = None, batch_size: int = BATCH_SIZE, queue_batches: int = QUEUE_BATCHES,
+                 on_planned: Callable[[PlannedMove], None] | None = None) -> None:
+        self.src_root = src_root
+        self.dst_root = dst_root
+        self.rule_manager = rule_manager
+        self.exclude = tuple(exclude)
+        self.max_depth = max_depth
+        self.create_folders = create_folders
+        self.journal_path = journal_path  # None for a dry run
+        self.batch_size = batch_size
+        self.queue_batches = queue_batches
+        self.on_planned = on_planned or self.print_planned
+        # One planner for the whole run, so collisions between batches are still caught
+        self.planner = MovePlanner(collision)
+        self.summary: Counter[str] = Counter()
+        self.stop = threading.Event()
+
+    def print_planned(self, planned: PlannedMove):
+        if self.journal_path is None:
+            print_plan([planned], self.create_folders)
+        elif not planned.ready:
+            print(f"[{planned.status}] {planned.src} -> {planned.dst}")
+
+    def run(self) -> Counter[str]:
+        asyncio.run(self.run_async())
+        return self.summary
+
+    async def run_async(self):
+        names: asyncio.Queue[list[tuple[str, str]] | None] = asyncio.Queue(self.queue_batches)
+        moves: asyncio.Queue[list[tuple[Path, Path]] | None] = asyncio.Queue(self.queue_batches)
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(asyncio.to_thread(self.walk, asyncio.get_running_loop(), names))
+                group.create_task(self.classify(names, moves))
+                group.create_task(self.move(moves))
+        finally:
+            # Lets the walker thread give up if the pipeline failed while it was waiting on a full queue
+            self.stop.set()
+
+    def walk(self, loop: asyncio.AbstractEventLoop, out: asyncio.Queue):
+        """
+        Runs in a worker thread; blocks while the queue is full.
+        """
+        batch: list[tuple[str, str]] = []
+        for entry in walk_files(self.src_root, exclude=self.exclude, max_depth=self.max_depth):
+            batch.append((entry.path, entry.name))
+            if len(batch) >= self.batch_size:
+                if not self.put(loop, out, batch):
+                    return
+                batch = []
+        if batch and not self.put(loop, out, batch):
+            return
+        self.put(loop, out, None)
+
+    def put(self, loop: asyncio.AbstractEventLoop, out: asyncio.Queue, item) -> bool:
+        future = asyncio.run_coroutine_threadsafe(out.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                if self.stop.is_set():
+                    future.cancel()
+                    return False
+
+    def classify_batch(self, batch: list[tuple[str, str]]) -> list[tuple[Path, Path]]:
+        moves: list[tuple[Path, Path]] = []
+        for path, name in batch:
+            result = self.rule_manager.match(name)
+            if result is not None:
+                moves.append((Path(path), self.dst_root.joinpath(result.path, name)))
+        return moves
+
+    async def classify(self, names: asyncio.Queue, moves: asyncio.Queue):
+        while (batch := await names.get()) is not None:
+            classified = await asyncio.to_thread(self.classify_batch, batch)
+            if classified:
+                await moves.put(classified)
+        await moves.put(None)
+
+    def move_batch(self, batch: list[tuple[Path, Path]]):
+        confirm_create = (lambda folders: True) if self.create_folders and self.journal_path else None
+        plan = self.planner.plan(batch, confirm_create)
+        for planned in plan:
+            self.on_planned(planned)
+            if not planned.ready or self.journal_path is None:
+                self.summary[str(planned.status or "planned")] += 1
+
+        if self.journal_path is None:
+            return
+
+        ready = [(planned.src, planned.dst) for planned in plan if planned.ready]
+        if not ready:
+            return
+
+        from journal import MoveJournal
+        from MoveExecutor import MoveExecutor
+
+        for result in MoveJournal(self.journal_path).execute(MoveExecutor(), ready):
+            self.summary[str(result.status)] += 1
+            if result.status != MoveStatus.MOVED:
+                error = f" ({result.error})" if result.error else ""
+                print(f"[{result.status}] {result.src} -> {result.dst}{error}")
+
+    async def move(self, moves: asyncio.Queue):
+        # Batches are moved one at a time (each batch's moves run in parallel in the executor),
+        # which keeps journal appends and planner state single-threaded
+        while (batch := await moves.get()) is not None:
+            await asyncio.to_thread(self.move_batch, batch)
@@ -0,0 +1,143 @@
+import heapq
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Any, Iterator
+
+SLOWEST_FILES = 20
+
+
+class Profiler:
+    """
+    Records per-stage wall and CPU time, counters and the slowest files, and writes them
+    as a Chrome trace-event file (open in chrome://tracing or https://ui.perfetto.dev).
+    Per-file timing is only added by instrument(), so nothing is paid unless profiling is on.
+    """
+
+    def __init__(self, slowest: int = SLOWEST_FILES) -> None:
+        self.slowest = slowest
+        self.origin = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self.events: list[dict[str, Any]] = []
+        self.counts: Counter[str] = Counter()
+        self.rule_evaluations: Counter[str] = Counter()
+        self.rule_matches: Counter[str] = Counter()
+        self.slowest_files: list[tuple[float, str, str]] = []  # min-heap of (seconds, label, file)
+        self.lock = threading.Lock()
+
+    def timestamp_us(self) -> float:
+        return (time.perf_counter_ns() - self.origin) / 1000
+
+    @contextmanager
+    def stage(self, name: str, **args: Any) -> Iterator[None]:
+        start, start_cpu = self.timestamp_us(), time.process_time_ns()
+        try:
+            yield
+        finally:
+            end, cpu_ms = self.timestamp_us(), (time.process_time_ns() - start_cpu) / 1e6
+            with self.lock:
+                self.events.append({
+                    "name": name, "cat": "stage", "ph": "X", "ts": start, "dur": end - start,
+                    "pid": self.pid, "tid": threading.get_ident(),
+                    "args": {"cpu_ms": round(cpu_ms, 3), **args},
+                })
+
+    def count(self, name: str, n: int = 1):
+        with self.lock:
+            self.counts[name] += n
+            self.events.append({"name": name, "ph": "C", "ts": self.timestamp_us(), "pid": self.pid,
+                                "args": {name: self.counts[name]}})
+
+    def record_file(self, label: str, file: str, seconds: float):
+        item = (seconds, label, file)
+        with self.lock:
+            if len(self.slowest_files) < self.slowest:
+                heapq.heappush(self.slowest_files, item)
+            elif item > self.slowest_files[0]:
+                heapq.heapreplace(self.slowest_files, item)
+
+    def instrument(self, obj: Any, method: str, label: str | None = None):
+        """
+        Replaces obj.method (which takes a filename first) with a wrapper that times every call.
+        Only this instance is affected.
+        """
+        original = getattr(obj, method)
+        label = label or f"{type(obj).__name__}.{method}"
+
+        def wrapper(file: str, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(file, *args, **kwargs)
+            finally:
+                self.record_file(label, file, time.perf_counter() - start)
+
+        setattr(obj, method, wrapper)
+
+    def instrument_rules(self, rule_manager: Any):
+        """
+        Times RuleManager.match per file and counts, per top-level rule, how many files it was
+        evaluated against (past the prefilter, before the first hit, on a shape cache miss)
+        and how many it matched.
+        """
+        original = rule_manager.match
+
+        def evaluated(name: str):
+            with self.lock:
+                self.rule_evaluations[name] += 1
+
+        def match(file: str):
+            start = time.perf_counter()
+            result = original(file)
+            self.record_file("RuleManager.match", file, time.perf_counter() - start)
+
+            if result is not None:
+                with self.lock:
+                    self.rule_matches[result.rules[0]] += 1
+            return result
+
+        rule_manager.on_evaluate = evaluated
+        rule_manager.match = match
+
+    def trace(self) -> dict[str, Any]:
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "DownloadSorter"}}]
+        return {
+            "traceEvents": metadata + self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "counts": dict(self.counts),
+                "rule_evaluations": dict(self.rule_evaluations.most_common()),
+                "rule_matches": dict(self.rule_matches.most_common()),
+                "slowest_files": [
+                    {"file": file, "where": label, "ms": round(seconds * 1000, 3)}
+                    for seconds, label, file in sorted(self.slowest_files, reverse=True)
+                ],
+            },
+        }
+
+    def write(self, path: str | os.PathLike):
+        with open(path, "w") as f:
+            json.dump(self.trace(), f, indent=1)
+
+
+class NullProfiler:
+    """
+    Stand-in used when profiling is off; every hook is a no-op.
+    """
+
+    def stage(self, name: str, **args: Any):
+        return nullcontext()
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+    def instrument(self, obj: Any, method: str, label: str | None = None):
+        pass
+
+    def instrument_rules(self, rule_manager: Any):
+        pass
+
+    def write(self, path: str | os.PathLike):
+        pass
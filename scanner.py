@@ -0,0 +1,30 @@
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+from file_walker import walk_files
+from MatchResult import MatchResult
+from RuleManager import RuleManager
+from ScanIndex import ScanIndex
+
+
+def scan_rules(src_folder_path: Path, rule_manager: RuleManager, scan_index: ScanIndex,
+               max_depth: int | None = None, cancel: threading.Event | None = None
+               ) -> Iterator[tuple[os.DirEntry, MatchResult]]:
+    """
+    Yields (entry, result) for every file under src_folder_path that a rule matches.
+    Results for unchanged files come from the scan index. Setting cancel stops the walk
+    at the next entry, matched or not.
+    """
+    def classify(name: str) -> list[Any]:
+        result = rule_manager.match(name)
+        if result is None:
+            return []
+        return [list(result.rules), [list(capture) for capture in result.captures], result.path]
+
+    for entry in walk_files(src_folder_path, max_depth=max_depth, cancel=cancel):
+        cached = scan_index.classify(entry, classify)
+        if cached:
+            rules, captures, path = cached
+            yield entry, MatchResult(tuple(rules), tuple(tuple(capture) for capture in captures), path)
@@ -0,0 +1,143 @@
+import argparse
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from file_walker import walk_files
+from MatchResult import MatchResult
+from mover import MoveStatus
+from MovePlanner import Collision, MovePlanner, PlannedMove
+from profiler import NullProfiler, Profiler
+from RuleManager import RuleManager
+from RuleParser import RULES_CACHE, RuleParser
+
+BASE_DST_PATH = Path("C:/Users/morri/Onedrive/University")
+BASE_SRC_PATH = Path("C:/Users/morri/Downloads")
+JOURNAL_PATH = "./move_journal.ndjson"
+RULES_HELP = "rules file (default: rules built from courses.json and year_to_folder.json)"
+
+
+def classify_folder(src_root: Path, dst_root: Path, rule_manager: RuleManager, exclude: Iterable[str] = (),
+                    max_depth: int | None = None) -> Iterator[tuple[os.DirEntry, Path, MatchResult]]:
+    """
+    Yields (entry, dst, result) for every file under src_root that a rule matches.
+    """
+    for entry in walk_files(src_root, exclude=exclude, max_depth=max_depth):
+        result = rule_manager.match(entry.name)
+        if result is not None:
+            yield entry, dst_root.joinpath(result.path, entry.name), result
+
+
+def load_rules(rules: str | None, cache_path: str | os.PathLike = RULES_CACHE) -> RuleManager:
+    """
+    Loads a rules file, or without one the rules built from courses.json that the CLI and GUI
+    use. Either way the compiled rules are cached in cache_path.
+    """
+    if rules is None:
+        from course_rules import load_course_rules
+
+        return load_course_rules(cache_path=cache_path)
+    return RuleParser(rules).load(cache_path)
+
+
+def print_plan(plan: list[PlannedMove], create_folders: bool = False):
+    for planned in plan:
+        if planned.ready:
+            status = "move"
+        elif planned.status == MoveStatus.MISSING_FOLDER and create_folders:
+            status = "move, new folder"
+        else:
+            status = planned.status
+        print(f"[{status}] {planned.src} -> {planned.dst}")
+
+
+def apply_plan(plan: list[PlannedMove], journal_path: str, summary: Counter[str] | None = None) -> Counter[str]:
+    """
+    Runs the ready moves through the journal and executor, printing every move that didn't happen.
+    Returns the number of files per status.
+    """
+    # The executor's thread pool is only needed once files are actually moved
+    from journal import MoveJournal
+    from MoveExecutor import MoveExecutor
+
+    summary = summary if summary is not None else Counter()
+    ready = [(planned.src, planned.dst) for planned in plan if planned.ready]
+    for planned in plan:
+        if not planned.ready:
+            summary[str(planned.status)] += 1
+            print(f"[{planned.status}] {planned.src} -> {planned.dst}")
+
+    for result in MoveJournal(journal_path).execute(MoveExecutor(), ready):
+        summary[str(result.status)] += 1
+        if result.status != MoveStatus.MOVED:
+            error = f" ({result.error})" if result.error else ""
+            print(f"[{result.status}] {result.src} -> {result.dst}{error}")
+    return summary
+
+
+def print_summary(summary: Counter[str]):
+    print(", ".join(f"{count} {status}" for status, count in summary.most_common()) or "Nothing to sort")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="sort", description="Sort files without any prompts")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--dry-run", action="store_true", help="only print what would be moved (default)")
+    mode.add_argument("--apply", action="store_true", help="move the files")
+    parser.add_argument("--src", type=Path, default=BASE_SRC_PATH, help="folder to sort")
+    parser.add_argument("--dst", type=Path, default=BASE_DST_PATH, help="root that rule paths are relative to")
+    parser.add_argument("--rules", default=None, help=RULES_HELP)
+    parser.add_argument("--rules-cache", default=RULES_CACHE, help="compiled rules cache")
+    parser.add_argument("--exclude", action="append", default=[], help="glob of names to skip (repeatable)")
+    parser.add_argument("--max-depth", type=int, default=None, help="how deep to walk below --src")
+    parser.add_argument("--create-folders", action="store_true", help="create missing destination folders")
+    parser.add_argument("--collision", choices=[c.value for c in Collision], default=Collision.SKIP.value,
+                        help="what to do when the destination name is taken")
+    parser.add_argument("--journal", default=JOURNAL_PATH, help="journal file for --apply")
+    parser.add_argument("--stream", action="store_true",
+                        help="walk, classify and move concurrently in batches instead of one stage after another")
+    parser.add_argument("--profile", metavar="TRACE_JSON", help="write a Chrome trace of the run to this file")
+    args = parser.parse_args(argv)
+
+    profiler = Profiler() if args.profile else NullProfiler()
+    try:
+        with profiler.stage("parse_rules"):
+            rule_manager = load_rules(args.rules, args.rules_cache)
+        profiler.instrument_rules(rule_manager)
+
+        if args.stream:
+            from pipeline import Pipeline
+
+            pipeline = Pipeline(args.src, args.dst, rule_manager, args.exclude, args.max_depth, Collision(args.collision),
+                                args.create_folders, args.journal if args.apply else None)
+            with profiler.stage("pipeline"):
+                summary = pipeline.run()
+            print_summary(summary)
+            return
+
+        with profiler.stage("scan"):
+            matches = list(classify_folder(args.src, args.dst, rule_manager, args.exclude, args.max_depth))
+        profiler.count("matched", len(matches))
+
+        with profiler.stage("plan", files=len(matches)):
+            confirm_create = (lambda folders: True) if args.apply and args.create_folders else None
+            moves = [(Path(entry.path), dst) for entry, dst, _ in matches]
+            plan = MovePlanner(Collision(args.collision)).plan(moves, confirm_create)
+
+        if not args.apply:
+            print_plan(plan, args.create_folders)
+            return
+
+        with profiler.stage("send", files=len(plan)):
+            summary = apply_plan(plan, args.journal)
+        print_summary(summary)
+    finally:
+        profiler.write(args.profile)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,222 @@
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from mover import MoveStatus, move_file
+from RuleManager import RuleManager
+from sorter import RULES_HELP, load_rules
+
+BASE_DST_PATH = Path("C:/Users/morri/Onedrive/University")
+BASE_SRC_PATH = Path("C:/Users/morri/Downloads")
+
+# Browsers write to these while a download is in progress, then rename to the real name
+PARTIAL_SUFFIXES = (".part", ".partial", ".crdownload", ".download", ".opdownload", ".tmp")
+
+SETTLE_SECONDS = 0.3
+POLL_SECONDS = 1.0
+
+
+def is_partial_download(path: str) -> bool:
+    return path.lower().endswith(PARTIAL_SUFFIXES)
+
+
+class InotifyBackend:
+    """
+    Reports files closed after writing or moved into a folder, using Linux inotify through libc.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, folder: Path) -> None:
+        self.folder = folder
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {folder}")
+
+    def wait(self, timeout: float | None) -> list[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths: list[str] = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were dropped, so fall back to looking at everything in the folder
+                return [entry.path for entry in os.scandir(self.folder) if entry.is_file()]
+            if name and not mask & self.IN_ISDIR:
+                paths.append(os.path.join(self.folder, os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """
+    Reports new or changed files by comparing directory snapshots taken every interval.
+    """
+
+    def __init__(self, folder: Path, interval: float = POLL_SECONDS) -> None:
+        self.folder = folder
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot: dict[str, tuple[int, int]] = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout: float | None) -> list[str]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self.take_snapshot()
+        changed = [path for path, state in snapshot.items() if self.snapshot.get(path) != state]
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class Watcher:
+    """
+    Sorts files as they land in src_root.
+    Events are coalesced per path, and a file is only moved once its size has stayed the
+    same for one settle interval, so partially written downloads are left alone.
+    """
+
+    pending: dict[str, tuple[float, int | None]]
+
+    def __init__(self, src_root: Path, dst_root: Path, rule_manager: RuleManager,
+                 create_folders: bool = False, settle: float = SETTLE_SECONDS, poll: bool = False,
+                 on_result: Callable[[Path, Path | None, MoveStatus | None], None] | None = None) -> None:
+        self.src_root = src_root
+        self.dst_root = dst_root
+        self.rule_manager = rule_manager
+        self.create_folders = create_folders
+        self.settle = settle
+        self.on_result = on_result or self.print_result
+        self.pending = {}  # path -> (deadline, size at last check)
+        self.backend = self.open_backend(poll)
+
+    def open_backend(self, poll: bool) -> InotifyBackend | PollingBackend:
+        if not poll and sys.platform.startswith("linux"):
+            try:
+                return InotifyBackend(self.src_root)
+            except (OSError, AttributeError):
+                pass
+        return PollingBackend(self.src_root)
+
+    def notify(self, path: str):
+        if is_partial_download(path):
+            return
+        _, size = self.pending.get(path, (0.0, None))
+        self.pending[path] = (time.monotonic() + self.settle, size)
+
+    def next_timeout(self) -> float | None:
+        if not self.pending:
+            return None
+        return max(0.0, min(deadline for deadline, _ in self.pending.values()) - time.monotonic())
+
+    def process_due(self):
+        now = time.monotonic()
+        for path, (deadline, size) in list(self.pending.items()):
+            if deadline > now:
+                continue
+
+            try:
+                current_size = os.stat(path).st_size
+            except FileNotFoundError:
+                del self.pending[path]
+                continue
+
+            if current_size != size:
+                # Still growing (or first check): wait another settle interval
+                self.pending[path] = (now + self.settle, current_size)
+                continue
+
+            del self.pending[path]
+            self.sort_file(Path(path))
+
+    def sort_file(self, src: Path):
+        result = self.rule_manager.match(src.name)
+        if result is None:
+            self.on_result(src, None, None)
+            return
+
+        dst = self.dst_root.joinpath(result.path, src.name)
+        try:
+            status = move_file(src, dst, lambda folder: self.create_folders)
+        except OSError as error:
+            print(f"Error moving {src}: {error}")
+            return
+        self.on_result(src, dst, status)
+
+    def print_result(self, src: Path, dst: Path | None, status: MoveStatus | None):
+        if dst is None:
+            return
+        print(f"[{status}] {src.name} -> {dst}")
+
+    def run(self):
+        try:
+            while True:
+                for path in self.backend.wait(self.next_timeout()):
+                    self.notify(path)
+                self.process_due()
+        finally:
+            self.backend.close()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Sort files into place as they are downloaded")
+    parser.add_argument("--src", type=Path, default=BASE_SRC_PATH, help="folder to watch")
+    parser.add_argument("--dst", type=Path, default=BASE_DST_PATH, help="root that rule paths are relative to")
+    parser.add_argument("--rules", default=None, help=RULES_HELP)
+    parser.add_argument("--create-folders", action="store_true", help="create missing destination folders")
+    parser.add_argument("--poll", action="store_true", help="poll instead of using inotify")
+    args = parser.parse_args(argv)
+
+    rule_manager = load_rules(args.rules)
+    watcher = Watcher(args.src, args.dst, rule_manager, create_folders=args.create_folders, poll=args.poll)
+    print(f"Watching {args.src} ({type(watcher.backend).__name__})")
+    watcher.run()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass